@@ -5,11 +5,32 @@ An AI-powered agent that helps users find the perfect Airbnb listings using natu
 
 from flask import Flask, render_template, request, jsonify
 from flask_cors import CORS
+import click
+import atexit
+import base64
+import heapq
+import io
+import itertools
 import json
+import mmap
+import multiprocessing
+import os
+import pickle
 import re
-from datetime import datetime
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from datetime import date, datetime
 import random
 
+import numpy as np
+
 app = Flask(__name__)
 CORS(app)
 
@@ -19,6 +40,8 @@ MOCK_LISTINGS = [
         "id": 1,
         "title": "Cozy Downtown Apartment",
         "location": "New York, NY",
+        "latitude": 40.7128,
+        "longitude": -74.006,
         "price": 120,
         "rating": 4.8,
         "reviews": 234,
@@ -33,6 +56,8 @@ MOCK_LISTINGS = [
         "id": 2,
         "title": "Beachfront Villa",
         "location": "Miami, FL",
+        "latitude": 25.7907,
+        "longitude": -80.13,
         "price": 250,
         "rating": 4.9,
         "reviews": 156,
@@ -47,6 +72,8 @@ MOCK_LISTINGS = [
         "id": 3,
         "title": "Mountain Cabin Retreat",
         "location": "Aspen, CO",
+        "latitude": 39.1911,
+        "longitude": -106.8175,
         "price": 180,
         "rating": 4.7,
         "reviews": 89,
@@ -61,6 +88,8 @@ MOCK_LISTINGS = [
         "id": 4,
         "title": "Modern Loft in Soho",
         "location": "New York, NY",
+        "latitude": 40.7233,
+        "longitude": -74.003,
         "price": 200,
         "rating": 4.6,
         "reviews": 312,
@@ -75,6 +104,8 @@ MOCK_LISTINGS = [
         "id": 5,
         "title": "Luxury Penthouse Suite",
         "location": "Los Angeles, CA",
+        "latitude": 34.0522,
+        "longitude": -118.2437,
         "price": 350,
         "rating": 4.9,
         "reviews": 201,
@@ -89,6 +120,8 @@ MOCK_LISTINGS = [
         "id": 6,
         "title": "Charming Studio Apartment",
         "location": "San Francisco, CA",
+        "latitude": 37.7599,
+        "longitude": -122.4148,
         "price": 95,
         "rating": 4.5,
         "reviews": 178,
@@ -103,6 +136,8 @@ MOCK_LISTINGS = [
         "id": 7,
         "title": "Family-Friendly House",
         "location": "Orlando, FL",
+        "latitude": 28.3852,
+        "longitude": -81.5639,
         "price": 150,
         "rating": 4.8,
         "reviews": 267,
@@ -117,6 +152,8 @@ MOCK_LISTINGS = [
         "id": 8,
         "title": "Historic Brownstone",
         "location": "Boston, MA",
+        "latitude": 42.3505,
+        "longitude": -71.0763,
         "price": 175,
         "rating": 4.7,
         "reviews": 145,
@@ -130,17 +167,142 @@ MOCK_LISTINGS = [
 ]
 
 
-class AirbnbAgent:
-    """AI Agent for finding Airbnb listings based on natural language queries"""
+# Query parsing
+VOCABULARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "vocabulary.json")
+
+# Price phrases in precedence order: a later phrase overrides an earlier one
+PRICE_LIMITS = {
+    "under": "max_price",
+    "less than": "max_price",
+    "below": "max_price",
+    "over": "min_price",
+    "more than": "min_price",
+    "above": "min_price"
+}
+
+# "within 5 miles of X" and "near X", where X is a place in the vocabulary's gazetteer
+RADIUS_PATTERN = (r'\bwithin\s+(?P<radius_value>\d+(?:\.\d+)?)\s*(?P<radius_unit>miles?|mi|km|kilomet(?:er|re)s?)'
+                  r'\s+(?:of|from)\s+(?P<radius_place>{places})|\bnear\s+(?P<near_place>{places})')
+NEAR_RADIUS_MILES = 5
+KM_PER_MILE = 1.609344
+
+# Stay dates: "dec 20-27", "dec 28 to jan 3", "12/20-12/27" or "2026-12-20 to 2026-12-27"
+MONTHS = {"jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+          "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12}
+MONTH_PATTERN = (r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+                 r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)')
+DATE_SEPARATOR = r'\s*(?:-|\u2013|\u2014|to|through|until|till)\s*'
+DATE_RANGE_PATTERN = (rf'\b(?P<in_month>{MONTH_PATTERN})\.?\s+(?P<in_day>\d{{1,2}})(?:st|nd|rd|th)?{DATE_SEPARATOR}'
+                      rf'(?:(?P<out_month>{MONTH_PATTERN})\.?\s+)?(?P<out_day>\d{{1,2}})(?:st|nd|rd|th)?\b'
+                      rf'|\b(?P<in_slash>\d{{1,2}}/\d{{1,2}}){DATE_SEPARATOR}(?P<out_slash>\d{{1,2}}/\d{{1,2}})\b'
+                      rf'|\b(?P<in_iso>\d{{4}}-\d{{2}}-\d{{2}}){DATE_SEPARATOR}(?P<out_iso>\d{{4}}-\d{{2}}-\d{{2}})\b')
+
+# A number followed by a price range dash, "bedroom" or a guest noun
+NUMBER_PATTERN = (r'\$?(?P<number>\d+)\s*(?:(?P<range>-)\s*(?=\$?(?P<range_max>\d+))'
+                  r'|(?P<bedrooms>bedroom)|(?P<guests>guest|people|person))')
+
+
+def load_vocabulary(path=VOCABULARY_PATH):
+    """Load the location, amenity and keyword vocabularies"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def trie_pattern(terms):
+    """Build a prefix-factored regex that matches the longest of the given terms"""
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
     
-    def __init__(self):
-        self.listings = MOCK_LISTINGS
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in node.items() if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            pattern = "(?:" + pattern + ")?"
+        return pattern
     
-    def parse_query(self, query):
-        """Parse natural language query to extract search criteria"""
-        query_lower = query.lower()
+    return build(trie) or "(?!)"
+
+
+def stay_dates(match, today):
+    """(check_in, check_out) dates from a DATE_RANGE_PATTERN match, or None if invalid"""
+    try:
+        if match.group("in_iso"):
+            check_in, check_out = date.fromisoformat(match.group("in_iso")), date.fromisoformat(match.group("out_iso"))
+        else:
+            if match.group("in_slash"):
+                (in_month, in_day), (out_month, out_day) = (
+                    map(int, match.group(side).split("/")) for side in ("in_slash", "out_slash"))
+            else:
+                in_month = MONTHS[match.group("in_month")[:3]]
+                in_day, out_day = int(match.group("in_day")), int(match.group("out_day"))
+                if match.group("out_month"):
+                    out_month = MONTHS[match.group("out_month")[:3]]
+                else:
+                    # "oct 28-3" runs into the next month
+                    out_month = in_month if out_day >= in_day else in_month % 12 + 1
+            check_in = date(today.year, in_month, in_day)
+            if check_in < today:
+                check_in = date(today.year + 1, in_month, in_day)
+            check_out = date(check_in.year, out_month, out_day)
+            if check_out < check_in:
+                check_out = date(check_in.year + 1, out_month, out_day)
+    except ValueError:
+        return None
+    return (check_in, check_out) if check_in < check_out else None
+
+
+class QueryParser:
+    """Single-pass query parser compiled once from the search vocabularies
+    
+    Every vocabulary term is folded into one prefix-trie regex alongside the
+    date, price, bedroom and guest patterns, so parsing is one scan of the
+    query however large the vocabularies grow.
+    """
+    
+    def __init__(self, vocabulary):
+        # term -> [(rank, field, value)], ranks keeping vocabulary order
+        terms = {}
+        for rank, location in enumerate(vocabulary["locations"]):
+            terms.setdefault(location, []).append((rank, "location", location.title()))
+        for rank, (keyword, amenity) in enumerate(vocabulary["amenities"].items()):
+            terms.setdefault(keyword, []).append((rank, "amenities", amenity))
+        for rank, keyword in enumerate(vocabulary["keywords"]):
+            terms.setdefault(keyword, []).append((rank, "keywords", keyword))
+        
+        # A matched term also counts the shorter terms inside it, e.g. "beach" in "beachfront"
+        self.term_actions = {}
+        for term in terms:
+            parts = {term[start:end] for start in range(len(term)) for end in range(start + 1, len(term) + 1)}
+            self.term_actions[term] = [action for part in parts for action in terms.get(part, ())]
+        
+        self.places = vocabulary.get("places", {})
+        
+        # Amounts are lookaheads so "under $150-200" still sees the range. Dates come before
+        # the numeric patterns so "dec 20-27" is a stay rather than a price range.
+        self.pattern = re.compile(
+            f"(?P<radius>{RADIUS_PATTERN.format(places=trie_pattern(self.places))})"
+            f"|(?P<dates>{DATE_RANGE_PATTERN})"
+            f"|(?P<term>{trie_pattern(terms)})"
+            f"|(?P<limit>(?P<limit_phrase>{trie_pattern(PRICE_LIMITS)})\\s*(?=\\$?(?P<limit_amount>\\d+)))"
+            f"|(?P<numeric>{NUMBER_PATTERN})"
+        )
+    
+    def parse(self, query, today=None):
+        """Extract search criteria from a natural language query
+        
+        Stay dates without a year are the next such dates on or after today.
+        """
         criteria = {
             "location": None,
+            "near": None,
+            "check_in": None,
+            "check_out": None,
             "max_price": None,
             "min_price": None,
             "bedrooms": None,
@@ -148,131 +310,1402 @@ class AirbnbAgent:
             "amenities": [],
             "keywords": []
         }
+        matched = {"location": {}, "amenities": {}, "keywords": {}}
+        first = {}
         
-        # Extract location
-        locations = ["new york", "miami", "aspen", "los angeles", "san francisco", "orlando", "boston"]
-        for loc in locations:
-            if loc in query_lower:
-                criteria["location"] = loc.title()
-                break
+        for match in self.pattern.finditer(query.lower()):
+            kind = match.lastgroup
+            if kind == "term":
+                for rank, field, value in self.term_actions[match.group("term")]:
+                    matched[field][rank] = value
+            elif kind == "radius":
+                first.setdefault("radius", match)
+            elif kind == "dates":
+                first.setdefault("dates", match)
+            elif kind == "limit":
+                first.setdefault(match.group("limit_phrase"), int(match.group("limit_amount")))
+            else:
+                for field in ("range", "bedrooms", "guests"):
+                    if match.group(field) is not None:
+                        first.setdefault(field, match)
+                        break
         
-        # Extract price range
-        price_patterns = [
-            (r'under\s*\$?(\d+)', 'max_price'),
-            (r'less than\s*\$?(\d+)', 'max_price'),
-            (r'below\s*\$?(\d+)', 'max_price'),
-            (r'over\s*\$?(\d+)', 'min_price'),
-            (r'more than\s*\$?(\d+)', 'min_price'),
-            (r'above\s*\$?(\d+)', 'min_price'),
-            (r'\$?(\d+)\s*-\s*\$?(\d+)', 'range'),
-        ]
-        
-        for pattern, ptype in price_patterns:
-            match = re.search(pattern, query_lower)
-            if match:
-                if ptype == 'max_price':
-                    criteria["max_price"] = int(match.group(1))
-                elif ptype == 'min_price':
-                    criteria["min_price"] = int(match.group(1))
-                elif ptype == 'range':
-                    criteria["min_price"] = int(match.group(1))
-                    criteria["max_price"] = int(match.group(2))
-        
-        # Extract bedrooms
-        bedroom_match = re.search(r'(\d+)\s*bedroom', query_lower)
-        if bedroom_match:
-            criteria["bedrooms"] = int(bedroom_match.group(1))
-        
-        # Extract guests
-        guest_match = re.search(r'(\d+)\s*(?:guest|people|person)', query_lower)
-        if guest_match:
-            criteria["guests"] = int(guest_match.group(1))
-        
-        # Extract amenities
-        amenity_keywords = {
-            "pool": "Pool",
-            "wifi": "WiFi",
-            "kitchen": "Kitchen",
-            "parking": "Parking",
-            "beach": "Beach Access",
-            "fireplace": "Fireplace",
-            "gym": "Gym",
-            "hot tub": "Hot Tub",
-            "washer": "Washer"
-        }
+        # Location: earliest in the vocabulary wins
+        if matched["location"]:
+            criteria["location"] = matched["location"][min(matched["location"])]
+        
+        # Radius around a known place
+        if "radius" in first:
+            match = first["radius"]
+            if match.group("radius_place"):
+                place = match.group("radius_place")
+                radius_km = float(match.group("radius_value"))
+                if match.group("radius_unit").startswith("mi"):
+                    radius_km *= KM_PER_MILE
+            else:
+                place = match.group("near_place")
+                radius_km = NEAR_RADIUS_MILES * KM_PER_MILE
+            latitude, longitude = self.places[place]
+            criteria["near"] = {
+                "place": place.title(),
+                "latitude": latitude,
+                "longitude": longitude,
+                "radius_km": round(radius_km, 3)
+            }
+        
+        # Stay dates, ignored if they are not a valid range
+        if "dates" in first:
+            stay = stay_dates(first["dates"], today or date.today())
+            if stay:
+                criteria["check_in"], criteria["check_out"] = (day.isoformat() for day in stay)
+        
+        # Price range: the first match of each phrase, later phrases overriding earlier ones
+        for phrase, field in PRICE_LIMITS.items():
+            if phrase in first:
+                criteria[field] = first[phrase]
+        if "range" in first:
+            criteria["min_price"] = int(first["range"].group("number"))
+            criteria["max_price"] = int(first["range"].group("range_max"))
         
-        for keyword, amenity in amenity_keywords.items():
-            if keyword in query_lower:
-                criteria["amenities"].append(amenity)
+        for field in ("bedrooms", "guests"):
+            if field in first:
+                criteria[field] = int(first[field].group("number"))
         
-        # Extract keywords
-        keywords = ["cozy", "luxury", "beachfront", "downtown", "mountain", "family", "studio", "penthouse"]
-        for keyword in keywords:
-            if keyword in query_lower:
-                criteria["keywords"].append(keyword)
+        for field in ("amenities", "keywords"):
+            criteria[field] = [value for _, value in sorted(matched[field].items())]
         
         return criteria
+
+
+# Catalogue backend: "memory" serves MOCK_LISTINGS, "sqlite" and "ndjson" read CATALOGUE_PATH
+CATALOGUE_BACKEND = os.environ.get("CATALOGUE_BACKEND", "memory")
+CATALOGUE_PATH = os.environ.get("CATALOGUE_PATH")
+
+# Worker processes for sharded search; 1 searches in the Flask process
+SEARCH_SHARDS = int(os.environ.get("SEARCH_SHARDS", "1"))
+
+# Fields read for every listing to build the search index; the rest are only read for results
+SCORING_FIELDS = ("id", "location", "latitude", "longitude", "price", "rating", "reviews", "bedrooms", "guests",
+                  "amenities", "title", "description")
+
+# Fields held in Listing slots, in output order; any other fields go in its extra dict
+LISTING_FIELDS = ("id", "title", "location", "latitude", "longitude", "price", "rating", "reviews", "bedrooms",
+                  "bathrooms", "guests", "amenities", "image", "description")
+
+LISTINGS_PAGE_SIZE = 100
+MAX_LISTINGS_PAGE_SIZE = 1000
+CATALOGUE_WRITE_BATCH_SIZE = 10000
+NDJSON_SCAN_BYTES = 64 * 1024 * 1024
+
+SEARCH_RESULT_LIMIT = 10
+MAX_SEARCH_LIMIT = 100
+
+# Search caches: normalized query -> criteria, and canonical criteria -> ranked results
+QUERY_CACHE_MAX_BYTES = 2 * 1024 * 1024
+RESULT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+SEARCH_CACHE_TTL_SECONDS = 300
+RESULT_ENTRY_BYTES = 64  # Rough footprint of one cached (position, score) pair
+
+# Candidates are scored this many at a time so memory stays bounded on large catalogues
+SCORE_CHUNK_SIZE = 65536
+
+# Spatial grid cell size in degrees; radius queries covering more cells than the cap scan instead
+GRID_CELL_DEGREES = 0.1
+MAX_GRID_CELLS = 4096
+EARTH_RADIUS_KM = 6371.0088
+
+# Availability calendars cover this many nights from today; updates are logged in CALENDAR_PATH
+CALENDAR_PATH = os.environ.get("CALENDAR_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "calendar.db"))
+CALENDAR_DAYS = 365
+MAX_CALENDAR_UPDATES = 100000
+CALENDAR_REPLAY_BATCH_SIZE = 100000
+
+# Batch searches score at most this many query x listing cells per block
+BATCH_SCORE_CELLS = 1 << 22
+MAX_BATCH_QUERIES = 10000
+BATCH_FIRST_BLOCK = 1024  # Listings in the first block; each further block doubles
+
+# Score the whole catalogue with array ops once the best index covers more than this share of it
+FULL_SCAN_FRACTION = 0.25
+
+# Queries with fewer candidates than this are not worth the round trip to the shard workers
+SHARD_MIN_CANDIDATES = 100000
+SHARED_ARRAY_MIN_BYTES = 4096  # Smaller index arrays are copied to each worker instead of shared
+
+# Amenity bitmasks are stored in 16-bit words; POPCOUNT_TABLE[word] is the number of bits set in it
+AMENITY_WORD_BITS = 16
+POPCOUNT_TABLE = sum((np.arange(1 << AMENITY_WORD_BITS) >> bit) & 1
+                     for bit in range(AMENITY_WORD_BITS)).astype(np.uint8)
+
+
+class Listing:
+    """Compact in-memory listing record
     
-    def search_listings(self, criteria):
-        """Search listings based on criteria"""
-        results = []
+    Known fields live in slots rather than a per-listing dict, location and
+    amenity names are interned so equal strings are shared, and amenities are
+    a tuple. Unset slots are fields the listing never had. Supports the read
+    access of a dict that the search index needs; to_dict() returns the
+    listing as it was given.
+    """
+    
+    __slots__ = LISTING_FIELDS + ("extra",)
+    
+    def __init__(self, record):
+        self.extra = None
+        for field, value in record.items():
+            if field == "location":
+                value = sys.intern(value)
+            elif field == "amenities":
+                value = tuple(sys.intern(amenity) for amenity in value)
+            if field in LISTING_FIELDS:
+                setattr(self, field, value)
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[field] = value
+    
+    def __getitem__(self, field):
+        try:
+            return getattr(self, field) if field in LISTING_FIELDS else self.extra[field]
+        except (AttributeError, KeyError, TypeError):
+            raise KeyError(field) from None
+    
+    def get(self, field, default=None):
+        try:
+            return self[field]
+        except KeyError:
+            return default
+    
+    def to_dict(self):
+        """The listing as a new dict, amenities as a list"""
+        record = {}
+        for field in LISTING_FIELDS:
+            if hasattr(self, field):
+                record[field] = getattr(self, field)
+        if "amenities" in record:
+            record["amenities"] = list(record["amenities"])
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+
+class Catalogue(ABC):
+    """Listing storage backend
+    
+    scoring_rows() streams just the SCORING_FIELDS of every listing in
+    position order to build the search index; full records are only read
+    through get() for the listings actually returned.
+    """
+    
+    @abstractmethod
+    def __len__(self):
+        """Number of listings"""
+    
+    @abstractmethod
+    def scoring_rows(self):
+        """Yield a dict with at least SCORING_FIELDS for each listing, in position order"""
+    
+    @abstractmethod
+    def get(self, positions):
+        """Return new full listing dicts for positions, in the same order"""
+    
+    def page(self, offset, limit):
+        """Return up to limit listings starting at position offset"""
+        return self.get(range(offset, min(offset + limit, len(self))))
+    
+    def records(self):
+        """Yield every full listing in position order"""
+        for offset in range(0, len(self), CATALOGUE_WRITE_BATCH_SIZE):
+            yield from self.page(offset, CATALOGUE_WRITE_BATCH_SIZE)
+
+
+class MemoryCatalogue(Catalogue):
+    """Catalogue held in memory as a list of compact Listing records"""
+    
+    def __init__(self, listings):
+        self.listings = [listing if isinstance(listing, Listing) else Listing(listing) for listing in listings]
+    
+    def __len__(self):
+        return len(self.listings)
+    
+    def scoring_rows(self):
+        return iter(self.listings)
+    
+    def get(self, positions):
+        return [self.listings[position].to_dict() for position in positions]
+
+
+class SQLiteCatalogue(Catalogue):
+    """Catalogue in a SQLite table with a column per scoring field and the full record as JSON"""
+    
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Catalogue not found: {path}")
+        self.path = path
+        self._local = threading.local()
+        self._size = None
+    
+    def _connection(self):
+        """One read-only connection per thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+    
+    def __len__(self):
+        if self._size is None:
+            self._size = self._connection().execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+        return self._size
+    
+    def scoring_rows(self):
+        cursor = self._connection().execute(f"SELECT {', '.join(SCORING_FIELDS)} FROM listings ORDER BY position")
+        for row in cursor:
+            row = dict(zip(SCORING_FIELDS, row))
+            row["amenities"] = json.loads(row["amenities"])
+            yield row
+    
+    def get(self, positions):
+        positions = [int(position) for position in positions]
+        if not positions:
+            return []
+        placeholders = ", ".join("?" * len(positions))
+        records = dict(self._connection().execute(
+            f"SELECT position, record FROM listings WHERE position IN ({placeholders})", positions
+        ))
+        return [json.loads(records[position]) for position in positions]
+    
+    def page(self, offset, limit):
+        cursor = self._connection().execute(
+            "SELECT record FROM listings WHERE position >= ? ORDER BY position LIMIT ?", (offset, limit)
+        )
+        return [json.loads(record) for record, in cursor]
+    
+    @staticmethod
+    def write(listings, path):
+        """Write listings to a new SQLite catalogue at path"""
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute("DROP TABLE IF EXISTS listings")
+            conn.execute(f"CREATE TABLE listings (position INTEGER PRIMARY KEY, record TEXT NOT NULL, "
+                         f"{', '.join(SCORING_FIELDS)})")
+            insert = (f"INSERT INTO listings (position, record, {', '.join(SCORING_FIELDS)}) "
+                      f"VALUES ({', '.join('?' * (len(SCORING_FIELDS) + 2))})")
+            rows = []
+            for position, listing in enumerate(listings):
+                values = [json.dumps(listing[field]) if field == "amenities" else listing.get(field)
+                          for field in SCORING_FIELDS]
+                rows.append((position, json.dumps(listing), *values))
+                if len(rows) >= CATALOGUE_WRITE_BATCH_SIZE:
+                    conn.executemany(insert, rows)
+                    rows = []
+            conn.executemany(insert, rows)
+            conn.commit()
+        finally:
+            conn.close()
+
+
+class NDJSONCatalogue(Catalogue):
+    """Catalogue in a newline-delimited JSON file, memory-mapped and addressed by line offsets"""
+    
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets = self._line_offsets()
+    
+    def _line_offsets(self):
+        """Start offset of every line plus the end of the file, found a chunk at a time"""
+        size = len(self._map)
+        starts = [np.zeros(1, dtype=np.int64)]
+        for start in range(0, size, NDJSON_SCAN_BYTES):
+            chunk = np.frombuffer(self._map, dtype=np.uint8, count=min(NDJSON_SCAN_BYTES, size - start), offset=start)
+            starts.append(np.flatnonzero(chunk == ord("\n")) + start + 1)
+        offsets = np.concatenate(starts)
+        if offsets[-1] != size:
+            offsets = np.append(offsets, size)
+        return offsets
+    
+    def __len__(self):
+        return len(self.offsets) - 1
+    
+    def _record(self, position):
+        return json.loads(self._map[self.offsets[position]:self.offsets[position + 1]])
+    
+    def scoring_rows(self):
+        for position in range(len(self)):
+            yield self._record(position)
+    
+    def get(self, positions):
+        return [self._record(position) for position in positions]
+    
+    @staticmethod
+    def write(listings, path):
+        """Write listings to a new NDJSON catalogue at path"""
+        with open(path, "w", encoding="utf-8") as f:
+            for listing in listings:
+                f.write(json.dumps(listing) + "\n")
+
+
+CATALOGUE_BACKENDS = {
+    "sqlite": SQLiteCatalogue,
+    "ndjson": NDJSONCatalogue
+}
+
+
+def open_catalogue(backend=CATALOGUE_BACKEND, path=CATALOGUE_PATH):
+    """Open the configured catalogue backend"""
+    if backend == "memory":
+        return MemoryCatalogue(MOCK_LISTINGS)
+    if backend not in CATALOGUE_BACKENDS:
+        raise ValueError(f"Unknown catalogue backend: {backend}")
+    if not path:
+        raise ValueError(f"CATALOGUE_PATH is required for the {backend} backend")
+    return CATALOGUE_BACKENDS[backend](path)
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    """Great-circle distance in km from one point to arrays of points"""
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class GridIndex:
+    """Fixed-size latitude/longitude grid over listing positions
+    
+    Positions are sorted by cell key (row * columns + column), so the cells
+    of one grid row inside a bounding box form a single contiguous slice.
+    """
+    
+    def __init__(self, latitudes, longitudes, cell_degrees=GRID_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.columns = int(np.ceil(360 / cell_degrees)) + 1
+        located = np.flatnonzero(np.isfinite(latitudes) & np.isfinite(longitudes))
+        keys = self._rows(latitudes[located]) * self.columns + self._columns(longitudes[located])
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.positions = located[order]
+    
+    def _rows(self, latitudes):
+        return np.floor((np.asarray(latitudes) + 90) / self.cell_degrees).astype(np.int64)
+    
+    def _columns(self, longitudes):
+        return np.floor((np.asarray(longitudes) + 180) / self.cell_degrees).astype(np.int64)
+    
+    def bounding_box(self, latitude, longitude, radius_km):
+        """Return (south, north, west, east) degrees enclosing the radius"""
+        lat_delta = np.degrees(radius_km / EARTH_RADIUS_KM)
+        lon_delta = lat_delta / max(np.cos(np.radians(latitude)), 1e-6)
+        return latitude - lat_delta, latitude + lat_delta, longitude - lon_delta, longitude + lon_delta
+    
+    def query(self, latitude, longitude, radius_km):
+        """Sorted positions in the cells touching the radius's bounding box, or None if too many cells"""
+        south, north, west, east = self.bounding_box(latitude, longitude, radius_km)
+        first_row, last_row = self._rows([max(south, -90), min(north, 90)])
+        first_column, last_column = self._columns([max(west, -180), min(east, 180)])
+        if (last_row - first_row + 1) * (last_column - first_column + 1) > MAX_GRID_CELLS:
+            return None
         
-        for listing in self.listings:
-            match_score = 0
-            
-            # Location match
-            if criteria["location"]:
-                if criteria["location"].lower() in listing["location"].lower():
-                    match_score += 10
-                else:
-                    continue  # Skip if location doesn't match
-            
-            # Price match
-            if criteria["max_price"] and listing["price"] > criteria["max_price"]:
+        slices = []
+        for row in range(first_row, last_row + 1):
+            start = np.searchsorted(self.keys, row * self.columns + first_column, "left")
+            end = np.searchsorted(self.keys, row * self.columns + last_column, "right")
+            slices.append(self.positions[start:end])
+        return np.sort(np.concatenate(slices))
+
+
+def bit_spans(low, high):
+    """uint64 words with bits [low, high) set, for arrays of bit offsets within 0..64"""
+    low, high = np.asarray(low, dtype=np.uint64), np.asarray(high, dtype=np.uint64)
+    width = np.where(high > low, high - low, 0).astype(np.uint64)
+    ones = np.where(width == 64, np.uint64(~np.uint64(0)), (np.uint64(1) << np.minimum(width, 63)) - np.uint64(1))
+    return ones << np.minimum(low, 63)
+
+
+class AvailabilityCalendar:
+    """Booked nights of every listing as a bitset over a fixed window
+    
+    Night i after start is bit i % 64 of booked[position, i // 64], set when
+    the listing is taken that night. A stay is free when the listing's words
+    ANDed with the stay's night mask are all zero, one mask operation over
+    the words the stay touches. Nights outside the window have no calendar
+    and count as free.
+    """
+    
+    def __init__(self, size, start=None, days=CALENDAR_DAYS):
+        self.start = date.today() if start is None else start
+        self.days = days
+        self.booked = np.zeros((size, -(-days // 64)), dtype=np.uint64, order="F")
+    
+    def reset(self, start):
+        """Clear every booking and move the window to begin on start"""
+        self.start = start
+        self.booked[...] = 0
+    
+    def nights(self, check_in, check_out):
+        """Night numbers [first, last) of a stay, clipped to the window"""
+        first = min(max((check_in - self.start).days, 0), self.days)
+        last = min(max((check_out - self.start).days, first), self.days)
+        return first, last
+    
+    def masks(self, first, last):
+        """Night masks for nights [first, last), one uint64 per calendar word
+        
+        first and last may also be (n, 1) arrays, giving an (n, words) array of masks.
+        """
+        offsets = np.arange(self.booked.shape[1]) * 64
+        return bit_spans(np.clip(first - offsets, 0, 64), np.clip(last - offsets, 0, 64))
+    
+    def available(self, positions, check_in, check_out):
+        """Boolean array of which listings at positions are free for every night of the stay"""
+        first, last = self.nights(check_in, check_out)
+        words = slice(first // 64, -(-last // 64))
+        return ~(self.booked[positions, words] & self.masks(first, last)[words]).any(axis=1)
+    
+    def update(self, positions, stays, available):
+        """Book, or free where available is true, the (check_in, check_out) stays of positions, in order
+        
+        stays may be date pairs, ISO date string pairs or an (n, 2) datetime64 array.
+        """
+        stays = np.asarray(stays, dtype="datetime64[D]").reshape(-1, 2)
+        days = (stays - np.datetime64(self.start, "D")).astype(np.int64)
+        first = np.clip(days[:, :1], 0, self.days)
+        masks = self.masks(first, np.clip(days[:, 1:], first, self.days))
+        words = np.arange(self.booked.shape[1])
+        positions, available = np.asarray(positions), np.asarray(available, dtype=bool)
+        
+        # Setting and clearing bits don't commute, so each run of equal flags is applied in turn
+        for run in np.split(np.arange(len(positions)), np.flatnonzero(np.diff(available)) + 1):
+            if not len(run):
                 continue
-            if criteria["min_price"] and listing["price"] < criteria["min_price"]:
+            if available[run[0]]:
+                np.bitwise_and.at(self.booked, (positions[run, None], words), ~masks[run])
+            else:
+                np.bitwise_or.at(self.booked, (positions[run, None], words), masks[run])
+
+
+class CalendarLog:
+    """Ordered log of calendar updates in SQLite, shared by every process serving the catalogue
+    
+    Each update gets an increasing seq, and every process applies the log in
+    seq order, its own updates included, so they all converge on the same
+    calendars and keep them across restarts. A path of None keeps the log in
+    memory for this process only. Callers serialize access to one instance.
+    """
+    
+    def __init__(self, path=None):
+        self.conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        if path:
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS calendar_updates (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                listing_id INTEGER NOT NULL,
+                check_in TEXT NOT NULL,
+                check_out TEXT NOT NULL,
+                available INTEGER NOT NULL
+            )
+        """)
+        self.conn.commit()
+    
+    def append(self, listing_ids, stays, available):
+        """Log (check_in, check_out) date stays of listings, in order"""
+        self.conn.executemany(
+            "INSERT INTO calendar_updates (listing_id, check_in, check_out, available) VALUES (?, ?, ?, ?)",
+            ((int(listing_id), check_in.isoformat(), check_out.isoformat(), bool(flag))
+             for listing_id, (check_in, check_out), flag in zip(listing_ids, stays, available))
+        )
+        self.conn.commit()
+    
+    def since(self, seq):
+        """Yield (last seq, listing ids, stays, available) arrays for the updates after seq, in batches"""
+        cursor = self.conn.execute(
+            "SELECT seq, listing_id, check_in, check_out, available FROM calendar_updates WHERE seq > ? ORDER BY seq",
+            (seq,)
+        )
+        while True:
+            rows = cursor.fetchmany(CALENDAR_REPLAY_BATCH_SIZE)
+            if not rows:
+                break
+            seqs, listing_ids, check_ins, check_outs, available = zip(*rows)
+            yield (seqs[-1], np.array(listing_ids, dtype=np.int64),
+                   np.array([check_ins, check_outs], dtype="datetime64[D]").T, np.array(available, dtype=bool))
+    
+    def prune(self, start):
+        """Drop updates for stays that end by start, which no calendar from start on can see"""
+        self.conn.execute("DELETE FROM calendar_updates WHERE check_out <= ?", (start.isoformat(),))
+        self.conn.commit()
+    
+    def close(self):
+        """Close the log's database connection"""
+        self.conn.close()
+
+
+class SortedColumn:
+    """Numeric listing column kept sorted for range lookups"""
+    
+    def __init__(self, values):
+        self.positions = np.argsort(values, kind="stable")
+        self.values = values[self.positions]
+    
+    def span(self, low=None, high=None):
+        """Return the (start, end) slice of values within [low, high]"""
+        start = 0 if low is None else int(np.searchsorted(self.values, low, "left"))
+        end = len(self.values) if high is None else int(np.searchsorted(self.values, high, "right"))
+        return start, max(start, end)
+    
+    def positions_in(self, span):
+        """Return the listing positions in a slice from span(), in catalogue order"""
+        return np.sort(self.positions[span[0]:span[1]])
+
+
+class ListingIndex:
+    """Columnar NumPy view of the listing catalogue with posting lists for search
+    
+    Numeric attributes are arrays, locations are interned ids and amenities a
+    bitmask per listing over the amenity vocabulary, so filtering and scoring
+    run as array expressions over the candidate positions.
+    """
+    
+    def __init__(self, catalogue, keywords=()):
+        self.catalogue = catalogue
+        ids, latitude, longitude, price, rating, bedrooms, guests, reviews = (array(code) for code in "qddddqqq")
+        location_ids, locations = array("i"), {}
+        amenity_rows, amenity_cols, amenity_ids = array("q"), array("q"), {}
+        keyword_flags = {keyword: array("b") for keyword in keywords}
+        
+        # One streaming pass keeps only compact typed columns, never the listing records
+        for position, row in enumerate(catalogue.scoring_rows()):
+            ids.append(row["id"])
+            latitude.append(row.get("latitude") if row.get("latitude") is not None else np.nan)
+            longitude.append(row.get("longitude") if row.get("longitude") is not None else np.nan)
+            price.append(row["price"])
+            rating.append(row["rating"])
+            bedrooms.append(row["bedrooms"])
+            guests.append(row["guests"])
+            reviews.append(row["reviews"])
+            location_ids.append(locations.setdefault(row["location"].lower(), len(locations)))
+            for amenity in row["amenities"]:
+                amenity_rows.append(position)
+                amenity_cols.append(amenity_ids.setdefault(amenity, len(amenity_ids)))
+            if keyword_flags:
+                text = f"{row['title']} {row['description']}".lower()
+                for keyword, flags in keyword_flags.items():
+                    flags.append(keyword in text)
+        
+        self.size = len(ids)
+        self.ids = np.frombuffer(ids, dtype=np.int64)
+        self.latitude = np.frombuffer(latitude, dtype=np.float64)
+        self.longitude = np.frombuffer(longitude, dtype=np.float64)
+        self.price = np.frombuffer(price, dtype=np.float64)
+        self.rating = np.frombuffer(rating, dtype=np.float64)
+        self.bedrooms = np.frombuffer(bedrooms, dtype=np.int64)
+        self.guests = np.frombuffer(guests, dtype=np.int64)
+        self.reviews = np.frombuffer(reviews, dtype=np.int64)
+        self.id_order = np.argsort(self.ids, kind="stable")
+        
+        # Interned locations, with each location's positions contiguous in location_order
+        self.location_ids = np.frombuffer(location_ids, dtype=np.int32)
+        self.location_names = list(locations)
+        self.location_order = np.argsort(self.location_ids, kind="stable")
+        self.location_offsets = np.searchsorted(self.location_ids[self.location_order], np.arange(len(locations) + 1))
+        
+        # Amenity i is bit i % 16 of word i // 16 in each listing's row of amenity_bits
+        self.amenity_ids = amenity_ids
+        words = max(1, -(-len(amenity_ids) // AMENITY_WORD_BITS))
+        self.amenity_bits = np.zeros((self.size, words), dtype=np.uint16, order="F")
+        amenity_cols = np.frombuffer(amenity_cols, dtype=np.int64)
+        amenity_rows = np.frombuffer(amenity_rows, dtype=np.int64)
+        np.bitwise_or.at(self.amenity_bits, (amenity_rows, amenity_cols // AMENITY_WORD_BITS),
+                         np.left_shift(1, amenity_cols % AMENITY_WORD_BITS).astype(np.uint16))
+        
+        self.keywords = {keyword: np.frombuffer(flags, dtype=np.int8).astype(bool)
+                         for keyword, flags in keyword_flags.items()}
+        
+        self.price_column = SortedColumn(self.price)
+        self.bedrooms_column = SortedColumn(self.bedrooms)
+        self.guests_column = SortedColumn(self.guests)
+        self.grid = GridIndex(self.latitude, self.longitude)
+        self.calendar = AvailabilityCalendar(self.size)
+        self._rating_order = None
+        self._location_matches = {}
+    
+    def location_matches(self, location):
+        """Return (location id mask, sorted positions) for locations containing the name"""
+        location = location.lower()
+        matches = self._location_matches.get(location)
+        if matches is None:
+            mask = np.array([location in name for name in self.location_names], dtype=bool)
+            postings = [self.location_order[self.location_offsets[i]:self.location_offsets[i + 1]]
+                        for i in np.flatnonzero(mask)]
+            postings = np.sort(np.concatenate(postings)) if postings else np.empty(0, dtype=np.intp)
+            matches = self._location_matches[location] = (mask, postings)
+        return matches
+    
+    def position_of(self, listing_id):
+        """Catalogue position of a listing id, or None if unknown"""
+        position = int(self.positions_of([listing_id])[0])
+        return None if position < 0 else position
+    
+    def positions_of(self, listing_ids):
+        """Catalogue positions of listing ids, -1 for unknown ids"""
+        listing_ids = np.asarray(listing_ids, dtype=np.int64)
+        if not self.size:
+            return np.full(len(listing_ids), -1, dtype=np.int64)
+        found = np.searchsorted(self.ids, listing_ids, sorter=self.id_order)
+        positions = self.id_order[np.minimum(found, self.size - 1)]
+        return np.where(self.ids[positions] == listing_ids, positions, -1)
+    
+    def amenity_mask(self, amenities):
+        """Bitmask words with the bits of the given amenities set; unknown amenities are ignored"""
+        mask = np.zeros(self.amenity_bits.shape[1], dtype=np.uint16)
+        for amenity in amenities:
+            if amenity in self.amenity_ids:
+                bit = self.amenity_ids[amenity]
+                mask[bit // AMENITY_WORD_BITS] |= 1 << (bit % AMENITY_WORD_BITS)
+        return mask
+    
+    def keyword_column(self, keyword):
+        """Boolean column of listings whose title or description contains the keyword"""
+        column = self.keywords.get(keyword)
+        if column is None:
+            column = np.array([keyword in f"{row['title']} {row['description']}".lower()
+                               for row in self.catalogue.scoring_rows()], dtype=bool)
+            self.keywords[keyword] = column
+        return column
+    
+    def candidates(self, criteria):
+        """Return the positions to score, as an index array or a slice of the catalogue
+        
+        Only the most selective posting list or range slice is enumerated;
+        the remaining filters are applied as masks over those positions. When
+        even that covers much of the catalogue, a full vectorized pass is
+        cheaper than gathering.
+        """
+        options = []
+        if criteria["location"]:
+            postings = self.location_matches(criteria["location"])[1]
+            options.append((len(postings), None, postings))
+        if criteria.get("near"):
+            near = criteria["near"]
+            nearby = self.grid.query(near["latitude"], near["longitude"], near["radius_km"])
+            if nearby is not None:
+                options.append((len(nearby), None, nearby))
+        if criteria["max_price"] or criteria["min_price"]:
+            span = self.price_column.span(criteria["min_price"] or None, criteria["max_price"] or None)
+            options.append((span[1] - span[0], self.price_column, span))
+        if criteria["bedrooms"] is not None:
+            span = self.bedrooms_column.span(criteria["bedrooms"])
+            options.append((span[1] - span[0], self.bedrooms_column, span))
+        if criteria["guests"]:
+            span = self.guests_column.span(criteria["guests"])
+            options.append((span[1] - span[0], self.guests_column, span))
+        
+        if not options:
+            return slice(0, self.size)
+        count, column, source = min(options, key=lambda option: option[0])
+        if count > self.size * FULL_SCAN_FRACTION:
+            return slice(0, self.size)
+        return source if column is None else column.positions_in(source)
+    
+    def score(self, criteria, positions, after=None):
+        """Return (positions, scores) of the listings among positions that pass the filters
+        
+        Positions is an index array or a slice of the catalogue. Filters are
+        evaluated as boolean masks first and only the survivors are scored.
+        after is an optional (score, position) and keeps only listings ranked
+        below it.
+        """
+        if isinstance(positions, slice):
+            keep = np.ones(positions.stop - positions.start, dtype=bool)
+        else:
+            keep = np.ones(len(positions), dtype=bool)
+        base_score = 0
+        
+        # Location match
+        if criteria["location"]:
+            keep &= self.location_matches(criteria["location"])[0][self.location_ids[positions]]
+            base_score += 10
+        
+        # Radius match, scored like a location match
+        if criteria.get("near"):
+            near = criteria["near"]
+            distance = haversine_km(near["latitude"], near["longitude"],
+                                    self.latitude[positions], self.longitude[positions])
+            keep &= distance <= near["radius_km"]
+            base_score += 10
+        
+        # Price match
+        if criteria["max_price"]:
+            keep &= self.price[positions] <= criteria["max_price"]
+        if criteria["min_price"]:
+            keep &= self.price[positions] >= criteria["min_price"]
+        
+        # Bedrooms and guests match
+        if criteria["bedrooms"] is not None:
+            keep &= self.bedrooms[positions] >= criteria["bedrooms"]
+            base_score += 5
+        if criteria["guests"]:
+            keep &= self.guests[positions] >= criteria["guests"]
+            base_score += 5
+        
+        # Free for every night of the stay
+        if criteria.get("check_in"):
+            keep &= self.calendar.available(positions, date.fromisoformat(criteria["check_in"]),
+                                            date.fromisoformat(criteria["check_out"]))
+        
+        if isinstance(positions, slice):
+            positions = np.flatnonzero(keep) + positions.start
+        else:
+            positions = positions[keep]
+        match_score = np.full(len(positions), base_score, dtype=np.int64)
+        
+        # Amenities match, two points per bit shared with the query's amenity mask
+        mask = self.amenity_mask(criteria["amenities"])
+        for word in np.flatnonzero(mask):
+            match_score += POPCOUNT_TABLE.take(self.amenity_bits[positions, word] & mask[word]) * 2
+        
+        # Keywords match
+        for keyword in criteria["keywords"]:
+            match_score += self.keyword_column(keyword)[positions] * 3
+        
+        # Rating boost
+        scores = match_score + self.rating[positions] * 2
+        matched = scores > 0
+        if after is not None:
+            after_score, after_position = after
+            matched &= (scores < after_score) | ((scores == after_score) & (positions > after_position))
+        return positions[matched], scores[matched]
+    
+    def search(self, criteria, limit, after=None, candidates=None):
+        """Return the best (position, score) pairs in ranking order, at most limit of them
+        
+        Candidates are scored a chunk at a time and only the best limit seen so
+        far are kept, in a min-heap keyed on (score, -position), so memory is
+        bounded by the chunk size and limit rather than the number of matches.
+        """
+        if candidates is None:
+            candidates = self.candidates(criteria)
+        if isinstance(candidates, slice):
+            chunks = (slice(start, min(start + SCORE_CHUNK_SIZE, candidates.stop))
+                      for start in range(candidates.start, candidates.stop, SCORE_CHUNK_SIZE))
+        else:
+            chunks = (candidates[start:start + SCORE_CHUNK_SIZE]
+                      for start in range(0, len(candidates), SCORE_CHUNK_SIZE))
+        
+        heap = []
+        for chunk in chunks:
+            positions, scores = self.score(criteria, chunk, after)
+            for i in top_k(positions, scores, limit):
+                entry = (scores[i].item(), -int(positions[i]))
+                if len(heap) < limit:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+        
+        return [(-negative_position, score) for score, negative_position in sorted(heap, reverse=True)]
+    
+    def search_batch(self, criteria_list, limit):
+        """Rank many criteria at once, returning (ranked pairs, milliseconds) lists in input order
+        
+        Criteria with a selective posting list or range go through search() on
+        their own. The rest are scored together by _search_matrix in one pass
+        over the catalogue, and that pass's time is split evenly between them.
+        """
+        ranked = [None] * len(criteria_list)
+        timings = [0.0] * len(criteria_list)
+        broad = []
+        for i, criteria in enumerate(criteria_list):
+            started = time.perf_counter()
+            candidates = self.candidates(criteria)
+            if isinstance(candidates, slice):
+                broad.append(i)
                 continue
+            ranked[i] = self.search(criteria, limit, candidates=candidates)
+            timings[i] = (time.perf_counter() - started) * 1000
+        
+        if broad:
+            started = time.perf_counter()
+            for i, result in zip(broad, self._search_matrix([criteria_list[i] for i in broad], limit)):
+                ranked[i] = result
+            shared = (time.perf_counter() - started) * 1000 / len(broad)
+            for i in broad:
+                timings[i] = shared
+        return ranked, timings
+    
+    @property
+    def rating_order(self):
+        """Positions by descending rating, ties in position order, built on first use"""
+        if self._rating_order is None:
+            self._rating_order = np.argsort(-self.rating, kind="stable")
+        return self._rating_order
+    
+    def _search_matrix(self, criteria_list, limit):
+        """Score many criteria together as a query x listing matrix over the rating order
+        
+        Listings are read in blocks of descending rating, each block once for
+        all still-active queries: filters are broadcast comparisons, amenity
+        points a popcount of each query's mask against the block's bitmasks,
+        keyword points a matrix product, and each query keeps its running top
+        `limit` with ties broken by position, exactly as search() ranks them. A
+        query stops once its limit-th score beats anything an unread listing
+        could reach (its fixed points plus every amenity and keyword bonus plus
+        the next rating), so most queries finish after the first block.
+        """
+        count = len(criteria_list)
+        max_price = np.array([c["max_price"] or np.inf for c in criteria_list], dtype=np.float64)
+        min_price = np.array([c["min_price"] or -np.inf for c in criteria_list], dtype=np.float64)
+        min_bedrooms = np.array([-np.inf if c["bedrooms"] is None else c["bedrooms"] for c in criteria_list])
+        min_guests = np.array([c["guests"] or -np.inf for c in criteria_list], dtype=np.float64)
+        base_score = np.array([10 * bool(c["location"]) + 10 * bool(c.get("near")) + 5 * (c["bedrooms"] is not None)
+                               + 5 * bool(c["guests"]) for c in criteria_list], dtype=np.float64)
+        
+        location_table = np.ones((count, len(self.location_names)), dtype=bool)
+        near = np.full((count, 3), np.nan)
+        stays = [None] * count
+        for i, c in enumerate(criteria_list):
+            if c["location"]:
+                location_table[i] = self.location_matches(c["location"])[0]
+            if c.get("near"):
+                near[i] = c["near"]["latitude"], c["near"]["longitude"], c["near"]["radius_km"]
+            if c.get("check_in"):
+                stays[i] = date.fromisoformat(c["check_in"]), date.fromisoformat(c["check_out"])
+        has_stay = np.array([stay is not None for stay in stays])
+        
+        # Amenity masks per query, and points per matched keyword as a query x keyword weight matrix
+        amenity_masks = np.array([self.amenity_mask(c["amenities"]) for c in criteria_list])
+        keywords = sorted({keyword for c in criteria_list for keyword in c["keywords"]})
+        keyword_weights = np.zeros((count, len(keywords)))
+        for i, c in enumerate(criteria_list):
+            for keyword in c["keywords"]:
+                keyword_weights[i, keywords.index(keyword)] += 3
+        keyword_columns = [self.keyword_column(keyword) for keyword in keywords]
+        ceiling = base_score + POPCOUNT_TABLE.take(amenity_masks).sum(axis=1) * 2 + keyword_weights.sum(axis=1)
+        
+        best_scores = np.full((count, limit), -np.inf)
+        best_positions = np.full((count, limit), np.iinfo(np.int64).max, dtype=np.int64)
+        active = np.arange(count)
+        start = 0
+        block_size = BATCH_FIRST_BLOCK
+        while len(active) and start < self.size:
+            block = self.rating_order[start:start + min(block_size, max(1024, BATCH_SCORE_CELLS // len(active)))]
+            start += len(block)
+            block_size *= 2
             
-            # Bedrooms match
-            if criteria["bedrooms"] is not None:
-                if listing["bedrooms"] >= criteria["bedrooms"]:
-                    match_score += 5
-                else:
-                    continue
-            
-            # Guests match
-            if criteria["guests"]:
-                if listing["guests"] >= criteria["guests"]:
-                    match_score += 5
-                else:
-                    continue
-            
-            # Amenities match
-            if criteria["amenities"]:
-                matched_amenities = sum(1 for a in criteria["amenities"] if a in listing["amenities"])
-                match_score += matched_amenities * 2
+            keep = location_table[active][:, self.location_ids[block]]
+            for column, low, high in ((self.price, min_price, max_price), (self.bedrooms, min_bedrooms, None),
+                                      (self.guests, min_guests, None)):
+                values = column[block]
+                if np.isfinite(low[active]).any():
+                    keep &= values >= low[active, None]
+                if high is not None and np.isfinite(high[active]).any():
+                    keep &= values <= high[active, None]
+            for row in np.flatnonzero(~np.isnan(near[active, 0])):
+                latitude, longitude, radius_km = near[active[row]]
+                keep[row] &= haversine_km(latitude, longitude, self.latitude[block], self.longitude[block]) <= radius_km
+            for row in np.flatnonzero(has_stay[active]):
+                keep[row] &= self.calendar.available(block, *stays[active[row]])
             
-            # Keywords match
-            listing_text = f"{listing['title']} {listing['description']}".lower()
-            matched_keywords = sum(1 for k in criteria["keywords"] if k in listing_text)
-            match_score += matched_keywords * 3
+            # Integer points stay exact in float64, then the rating boost is added as in score()
+            points = np.repeat(base_score[active, None], len(block), axis=1)
+            for word in np.flatnonzero(amenity_masks[active].any(axis=0)):
+                points += POPCOUNT_TABLE.take(amenity_masks[active, word, None] & self.amenity_bits[block, word]) * 2
+            if keywords:
+                points += keyword_weights[active] @ np.vstack([column[block] for column in keyword_columns])
+            scores = points + self.rating[block] * 2
+            keep &= scores > 0
+            np.copyto(scores, -np.inf, where=~keep)
             
-            # Rating boost
-            match_score += listing["rating"] * 2
+            block_scores, block_positions = top_k_rows(scores, block, limit)
+            merged_scores = np.hstack([best_scores[active], block_scores])
+            merged_positions = np.hstack([best_positions[active], block_positions])
+            order = np.lexsort((merged_positions, -merged_scores), axis=1)[:, :limit]
+            best_scores[active] = np.take_along_axis(merged_scores, order, axis=1)
+            best_positions[active] = np.take_along_axis(merged_positions, order, axis=1)
             
-            if match_score > 0:
-                listing_copy = listing.copy()
-                listing_copy["match_score"] = match_score
-                results.append(listing_copy)
+            if start < self.size:
+                reachable = ceiling[active] + self.rating[self.rating_order[start]] * 2
+                active = active[best_scores[active, -1] <= reachable]
         
-        # Sort by match score
-        results.sort(key=lambda x: x["match_score"], reverse=True)
+        return [[(int(position), score.item()) for position, score in zip(positions, scores) if score > -np.inf]
+                for positions, scores in zip(best_positions, best_scores)]
+
+
+def top_k_rows(scores, positions, k):
+    """Per row of a score matrix, the k best (scores, positions) by score then position
+    
+    positions gives the catalogue position of each column. Rows with fewer
+    than k finite scores are padded with -inf. Only entries
+    at or above each row's k-th best score are sorted, so the cost follows k
+    plus the ties at the cut rather than the row length.
+    """
+    rows = len(scores)
+    if scores.shape[1] > k:
+        threshold = -np.partition(-scores, k - 1, axis=1)[:, k - 1:k]
+        row_ids, columns = np.nonzero((scores >= threshold) & (scores > -np.inf))
+    else:
+        row_ids, columns = np.nonzero(scores > -np.inf)
+    selected = scores[row_ids, columns]
+    
+    order = np.lexsort((positions[columns], -selected, row_ids))
+    row_ids, columns, selected = row_ids[order], columns[order], selected[order]
+    ranks = np.arange(len(row_ids)) - np.searchsorted(row_ids, row_ids, "left")
+    keep = ranks < k
+    
+    top_scores = np.full((rows, k), -np.inf)
+    top_positions = np.full((rows, k), np.iinfo(np.int64).max, dtype=np.int64)
+    top_scores[row_ids[keep], ranks[keep]] = selected[keep]
+    top_positions[row_ids[keep], ranks[keep]] = positions[columns[keep]]
+    return top_scores, top_positions
+
+
+def top_k(positions, scores, k):
+    """Indices of the k best scores, ordered by score then position like a stable sort"""
+    if len(scores) > k:
+        threshold = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)[:k - len(above)]
+        chosen = np.concatenate([above, ties])
+    else:
+        chosen = np.arange(len(scores))
+    return chosen[np.lexsort((positions[chosen], -scores[chosen]))]
+
+
+class SharedArrayPickler(pickle.Pickler):
+    """Pickler that moves large NumPy arrays into shared memory blocks
+    
+    The pickle carries only block names, so unpickling it in another process
+    maps the same memory instead of copying the data. Arrays are shared once
+    even when referenced from several places, and skip_objects are pickled
+    as references to nothing.
+    """
+    
+    def __init__(self, file, blocks, skip_objects=()):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.blocks = blocks
+        self.skip_ids = {id(obj) for obj in skip_objects}
+        self.shared = {}
+    
+    def persistent_id(self, obj):
+        if id(obj) in self.skip_ids:
+            return ("skip",)
+        if not isinstance(obj, np.ndarray) or obj.dtype.hasobject or obj.nbytes < SHARED_ARRAY_MIN_BYTES:
+            return None
+        if id(obj) not in self.shared:
+            order = "F" if obj.flags.f_contiguous and not obj.flags.c_contiguous else "C"
+            block = shared_memory.SharedMemory(create=True, size=obj.nbytes)
+            np.ndarray(obj.shape, obj.dtype, buffer=block.buf, order=order)[...] = obj
+            self.blocks.append(block)
+            self.shared[id(obj)] = ("array", block.name, obj.dtype.str, obj.shape, order)
+        return self.shared[id(obj)]
+
+
+class SharedArrayUnpickler(pickle.Unpickler):
+    """Unpickler for SharedArrayPickler output, mapping arrays onto the shared blocks"""
+    
+    def __init__(self, file, blocks):
+        super().__init__(file)
+        self.blocks = blocks
+        self.attached = {}
+    
+    def persistent_load(self, pid):
+        if pid[0] == "skip":
+            return None
+        _, name, dtype, shape, order = pid
+        if name not in self.attached:
+            block = self.attached[name] = shared_memory.SharedMemory(name=name)
+            self.blocks.append(block)
+        return np.ndarray(shape, dtype, buffer=self.attached[name].buf, order=order)
+
+
+def load_shared(payload, blocks):
+    """Rebuild an object pickled by SharedArrayPickler, appending the blocks it maps to blocks"""
+    return SharedArrayUnpickler(io.BytesIO(payload), blocks).load()
+
+
+_shard_index = None
+_shard_blocks = []
+
+
+def _init_shard_worker(payload):
+    """Process pool initializer: map the shared search index once per worker"""
+    global _shard_index
+    _shard_index = load_shared(payload, _shard_blocks)
+
+
+def _search_shard(bounds, criteria, limit, after, calendar_start):
+    """Search the listings at positions [start, stop) of the worker's index
+    
+    The calendar bits are shared with the parent, which moves them when the
+    window re-anchors, so the worker follows the parent's calendar_start.
+    """
+    _shard_index.calendar.start = calendar_start
+    start, stop = bounds
+    candidates = _shard_index.candidates(criteria)
+    if isinstance(candidates, slice):
+        candidates = slice(max(start, candidates.start), min(stop, candidates.stop))
+    else:
+        candidates = candidates[np.searchsorted(candidates, start):np.searchsorted(candidates, stop)]
+    return _shard_index.search(criteria, limit, after, candidates)
+
+
+class ShardedSearch:
+    """Search a ListingIndex split into position ranges across a process pool
+    
+    The index arrays live in shared memory, so each worker maps them once
+    when it starts and requests carry only the criteria. Every shard returns
+    its local top `limit` and the sorted shard results are merged into the
+    same ranking ListingIndex.search gives. Selective queries, and keywords
+    the index has not precomputed, are answered in this process instead.
+    """
+    
+    def __init__(self, index, shards):
+        self.blocks, self.attached = [], []
+        index.rating_order  # Build lazily computed state before sharing it
+        buffer = io.BytesIO()
+        SharedArrayPickler(buffer, self.blocks, skip_objects=[index.catalogue]).dump(index)
+        payload = buffer.getvalue()
         
-        return results[:10]  # Return top 10 results
+        # Search this process's copy of the index from the shared blocks too, so the arrays exist once
+        self.index = load_shared(payload, self.attached)
+        self.index.catalogue = index.catalogue
+        edges = np.linspace(0, index.size, shards + 1).astype(np.int64).tolist()
+        self.bounds = list(zip(edges, edges[1:]))
+        self.executor = ProcessPoolExecutor(shards, multiprocessing.get_context("spawn"),
+                                            initializer=_init_shard_worker, initargs=(payload,))
+        atexit.register(self.close)
+    
+    def search(self, criteria, limit, after=None):
+        """Return the best (position, score) pairs in ranking order, like ListingIndex.search"""
+        candidates = self.index.candidates(criteria)
+        count = candidates.stop - candidates.start if isinstance(candidates, slice) else len(candidates)
+        if count < SHARD_MIN_CANDIDATES or any(keyword not in self.index.keywords for keyword in criteria["keywords"]):
+            return self.index.search(criteria, limit, after, candidates)
+        
+        futures = [self.executor.submit(_search_shard, bounds, criteria, limit, after, self.index.calendar.start)
+                   for bounds in self.bounds]
+        ranked = heapq.merge(*(future.result() for future in futures), key=lambda pair: (-pair[1], pair[0]))
+        return list(itertools.islice(ranked, limit))
+    
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        atexit.unregister(self.close)
+        self.executor.shutdown()
+        for block in self.blocks:
+            block.unlink()
+        self.blocks = []
+
+
+class AirbnbAgent:
+    """AI Agent for finding Airbnb listings based on natural language queries"""
+    
+    def __init__(self, catalogue=None, vocabulary=None, shards=SEARCH_SHARDS, calendar_path=None):
+        if catalogue is None:
+            catalogue = open_catalogue()
+        elif isinstance(catalogue, list):
+            catalogue = MemoryCatalogue(catalogue)
+        self.catalogue = catalogue
+        self.version = 0  # Bumped whenever the catalogue changes, invalidating cached results
+        self.vocabulary = load_vocabulary() if vocabulary is None else vocabulary
+        self.parser = QueryParser(self.vocabulary)
+        self.shards = shards
+        self.calendar_path = calendar_path  # None keeps calendar updates in memory for this agent only
+        self._index = None
+        self._searcher = None
+        self._calendar_log = None
+        self._calendar_seq = 0  # Last calendar log entry applied to the index
+        self._index_lock = threading.Lock()
+        self._calendar_lock = threading.Lock()
+    
+    @property
+    def index(self):
+        """Search index over the catalogue, built on first use with the logged calendar updates"""
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    index = ListingIndex(self.catalogue, self.vocabulary["keywords"])
+                    with self._calendar_lock:
+                        self._load_calendar(index, date.today())
+                    self._index = index
+        return self._index
+    
+    @property
+    def searcher(self):
+        """The index, or a ShardedSearch over it when more than one shard is configured"""
+        if self.shards <= 1:
+            return self.index
+        if self._searcher is None:
+            index = self.index
+            with self._index_lock, self._calendar_lock:
+                if self._searcher is None:
+                    self._searcher = ShardedSearch(index, self.shards)
+                    self._index = self._searcher.index
+        return self._searcher
+    
+    @property
+    def calendar_log(self):
+        """The CalendarLog at calendar_path, opened on first use"""
+        if self._calendar_log is None:
+            self._calendar_log = CalendarLog(self.calendar_path)
+        return self._calendar_log
+    
+    def _load_calendar(self, index, start):
+        """Reset the index calendar to begin on start and replay the whole calendar log into it"""
+        self.calendar_log.prune(start)
+        index.calendar.reset(start)
+        self._calendar_seq = 0
+        self._apply_calendar_log(index)
+    
+    def _apply_calendar_log(self, index):
+        """Apply the calendar log entries after the last one applied, returning whether there were any"""
+        applied = False
+        for seq, listing_ids, stays, available in self.calendar_log.since(self._calendar_seq):
+            positions = index.positions_of(listing_ids)
+            known = positions >= 0  # Listings since removed from the catalogue are skipped
+            index.calendar.update(positions[known], stays[known], available[known])
+            self._calendar_seq = seq
+            applied = True
+        return applied
+    
+    def sync_calendar(self):
+        """Bring the calendars up to date and return the version cached results are keyed on
+        
+        Moves the calendar window to start today once the day changes, and
+        applies the updates logged since the last sync by this process or
+        any other sharing the calendar log.
+        """
+        index = self.index
+        with self._calendar_lock:
+            today = date.today()
+            if index.calendar.start != today:
+                self._load_calendar(index, today)
+                self.version += 1
+            elif self._apply_calendar_log(index):
+                self.version += 1
+            return self.version
+    
+    def update_calendar(self, listing_ids, stays, available):
+        """Book or free (check_in, check_out) stays of listings, in order, and return the new version
+        
+        The updates are written to the calendar log and applied from there,
+        so every process sharing the log sees them. Raises ValueError for
+        unknown listing ids, before changing anything.
+        """
+        index = self.index
+        unknown = np.asarray(listing_ids)[index.positions_of(listing_ids) < 0]
+        if len(unknown):
+            raise ValueError(f"Unknown listing ids: {unknown[:10].tolist()}")
+        with self._calendar_lock:
+            self.calendar_log.append(listing_ids, stays, available)
+        return self.sync_calendar()
+    
+    def close(self):
+        """Stop the shard workers, if any were started, and close the calendar log"""
+        if self._searcher is not None:
+            self._searcher.close()
+            self._searcher = None
+        if self._calendar_log is not None:
+            self._calendar_log.close()
+            self._calendar_log = None
+    
+    def parse_query(self, query, today=None):
+        """Parse natural language query to extract search criteria"""
+        return self.parser.parse(query, today)
+    
+    def rank(self, criteria, limit=SEARCH_RESULT_LIMIT, after=None):
+        """Return ranked (position, match_score) pairs for criteria
+        
+        after is the (match_score, id) of the last listing on the previous
+        page; results continue strictly below it in the ranking.
+        """
+        self.sync_calendar()
+        if after is not None:
+            position = self.index.position_of(after[1])
+            if position is None:
+                raise ValueError("Invalid cursor")
+            after = (after[0], position)
+        return self.searcher.search(criteria, limit, after)
+    
+    def hydrate(self, ranked):
+        """Turn ranked (position, match_score) pairs into listing dicts with a match_score"""
+        results = []
+        records = self.catalogue.get([position for position, _ in ranked])
+        for listing, (_, score) in zip(records, ranked):
+            listing["match_score"] = score
+            results.append(listing)
+        return results
+    
+    def search_listings(self, criteria, limit=SEARCH_RESULT_LIMIT, after=None):
+        """Search listings based on criteria"""
+        return self.hydrate(self.rank(criteria, limit, after))
+
+
+def encode_cursor(match_score, listing_id):
+    """Encode the (match_score, id) ranking position as an opaque cursor"""
+    raw = json.dumps([match_score, listing_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, raising ValueError if malformed"""
+    try:
+        match_score, listing_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(match_score, (int, float)) or not isinstance(listing_id, int):
+        raise ValueError("Invalid cursor")
+    return match_score, listing_id
+
+
+class SearchCache:
+    """Size-bounded LRU cache with a TTL, cleared when the catalogue version changes"""
+    
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+        self._version = None
+    
+    def get(self, key, version=None):
+        """Return the cached value for key at version, or None"""
+        with self._lock:
+            if version != self._version:
+                self._clear(version)
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, value, size, version=None):
+        """Store a value of roughly size bytes, evicting least recently used entries to fit"""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._size += size
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+    
+    def _clear(self, version):
+        self._entries.clear()
+        self._size = 0
+        self._version = version
+    
+    def stats(self):
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "version": self._version
+            }
+
+
+def normalize_query(query):
+    """Lowercase a query and collapse its whitespace, the form the query cache is keyed on"""
+    return " ".join(query.lower().split())
+
+
+def criteria_key(criteria):
+    """Canonical form of criteria, so equivalent queries share cached results"""
+    canonical = dict(criteria, amenities=sorted(criteria["amenities"]), keywords=sorted(criteria["keywords"]))
+    return json.dumps(canonical, sort_keys=True)
+
+
+def parse_cached(query):
+    """Parse a query through the normalized-query cache
+    
+    Stay dates without a year resolve against the current date, so entries
+    are keyed on the date as well and stop matching at midnight.
+    """
+    query = normalize_query(query)
+    today = date.today()
+    criteria = query_cache.get((query, today))
+    if criteria is None:
+        criteria = agent.parse_query(query, today)
+        query_cache.put((query, today), criteria, len(query) + len(json.dumps(criteria)))
+    return criteria
+
+
+def rank_cached(criteria, limit, after=None):
+    """Rank listings for criteria through the result cache, keyed on the catalogue version"""
+    key = (criteria_key(criteria), limit, after)
+    version = agent.sync_calendar()
+    ranked = result_cache.get(key, version)
+    if ranked is None:
+        ranked = agent.rank(criteria, limit, after)
+        result_cache.put(key, ranked, len(key[0]) + RESULT_ENTRY_BYTES * (len(ranked) + 1), version)
+    return ranked
+
+
+def rank_batch(criteria_list, limit):
+    """Rank many criteria through the result cache, scoring every miss in one batched pass
+    
+    Returns (ranked, cached, rank_ms) per criteria, in input order.
+    Equivalent criteria are ranked once.
+    """
+    version = agent.sync_calendar()
+    keys = [(criteria_key(criteria), limit, None) for criteria in criteria_list]
+    found = {}
+    for key in dict.fromkeys(keys):
+        started = time.perf_counter()
+        ranked = result_cache.get(key, version)
+        if ranked is not None:
+            found[key] = (ranked, True, (time.perf_counter() - started) * 1000)
+    
+    misses = {key: criteria for key, criteria in zip(keys, criteria_list) if key not in found}
+    if misses:
+        ranked_list, timings = agent.index.search_batch(list(misses.values()), limit)
+        for key, ranked, elapsed in zip(misses, ranked_list, timings):
+            result_cache.put(key, ranked, len(key[0]) + RESULT_ENTRY_BYTES * (len(ranked) + 1), version)
+            found[key] = (ranked, False, elapsed)
+    return [found[key] for key in keys]
+
+
+def result_page(ranked, limit):
+    """Hydrate up to limit ranked results, with a cursor if ranked holds one more"""
+    results = agent.hydrate(ranked[:limit])
+    next_cursor = None
+    if len(ranked) > limit:
+        next_cursor = encode_cursor(results[-1]["match_score"], results[-1]["id"])
+    return results, next_cursor
 
 
 # Initialize agent
-agent = AirbnbAgent()
+agent = AirbnbAgent(calendar_path=CALENDAR_PATH)
+query_cache = SearchCache(QUERY_CACHE_MAX_BYTES, SEARCH_CACHE_TTL_SECONDS)
+result_cache = SearchCache(RESULT_CACHE_MAX_BYTES, SEARCH_CACHE_TTL_SECONDS)
 
 
 @app.route('/')
@@ -292,33 +1725,180 @@ def search():
             return jsonify({"error": "Query is required"}), 400
         
         # Parse query using AI agent
-        criteria = agent.parse_query(query)
+        criteria = parse_cached(query)
+        
+        try:
+            limit = int(data.get('limit', SEARCH_RESULT_LIMIT))
+        except (TypeError, ValueError):
+            return jsonify({"error": "limit must be an integer"}), 400
+        if not 1 <= limit <= MAX_SEARCH_LIMIT:
+            return jsonify({"error": f"limit must be between 1 and {MAX_SEARCH_LIMIT}"}), 400
         
-        # Search listings
-        results = agent.search_listings(criteria)
+        # Search listings, fetching one extra to tell whether another page exists
+        try:
+            after = decode_cursor(data['cursor']) if data.get('cursor') else None
+            ranked = rank_cached(criteria, limit + 1, after)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        results, next_cursor = result_page(ranked, limit)
         
         return jsonify({
             "success": True,
             "query": query,
             "criteria": criteria,
             "results": results,
-            "count": len(results)
+            "count": len(results),
+            "next_cursor": next_cursor
         })
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/api/listings', methods=['GET'])
-def get_all_listings():
-    """Get all available listings"""
+@app.route('/api/search/batch', methods=['POST'])
+def search_batch():
+    """API endpoint for running many searches in one request"""
+    try:
+        started = time.perf_counter()
+        data = request.json
+        queries = data.get('queries')
+        
+        if not isinstance(queries, list) or not queries:
+            return jsonify({"error": "queries must be a non-empty list"}), 400
+        if len(queries) > MAX_BATCH_QUERIES:
+            return jsonify({"error": f"At most {MAX_BATCH_QUERIES} queries per batch"}), 400
+        if not all(isinstance(query, str) and query.strip() for query in queries):
+            return jsonify({"error": "Every query must be a non-empty string"}), 400
+        try:
+            limit = int(data.get('limit', SEARCH_RESULT_LIMIT))
+        except (TypeError, ValueError):
+            return jsonify({"error": "limit must be an integer"}), 400
+        if not 1 <= limit <= MAX_SEARCH_LIMIT:
+            return jsonify({"error": f"limit must be between 1 and {MAX_SEARCH_LIMIT}"}), 400
+        
+        # Parse each distinct normalized query once
+        parsed = {}
+        for query in queries:
+            normalized = normalize_query(query)
+            if normalized not in parsed:
+                parse_started = time.perf_counter()
+                parsed[normalized] = (parse_cached(normalized), (time.perf_counter() - parse_started) * 1000)
+        
+        # Rank each distinct query once, all cache misses in a single batched pass
+        unique = list(parsed)
+        ranked = dict(zip(unique, rank_batch([parsed[normalized][0] for normalized in unique], limit + 1)))
+        
+        responses = []
+        for query in queries:
+            normalized = normalize_query(query)
+            criteria, parse_ms = parsed[normalized]
+            ranked_results, cached, rank_ms = ranked[normalized]
+            results, next_cursor = result_page(ranked_results, limit)
+            responses.append({
+                "query": query,
+                "criteria": criteria,
+                "results": results,
+                "count": len(results),
+                "next_cursor": next_cursor,
+                "cached": cached,
+                "parse_ms": round(parse_ms, 3),
+                "rank_ms": round(rank_ms, 3)
+            })
+        
+        return jsonify({
+            "success": True,
+            "searches": responses,
+            "count": len(responses),
+            "unique_queries": len(unique),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+        })
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/calendar', methods=['POST'])
+def update_calendar():
+    """API endpoint for bulk availability calendar updates"""
+    try:
+        data = request.json
+        updates = data.get('updates')
+        
+        if not isinstance(updates, list) or not updates:
+            return jsonify({"error": "updates must be a non-empty list"}), 400
+        if len(updates) > MAX_CALENDAR_UPDATES:
+            return jsonify({"error": f"At most {MAX_CALENDAR_UPDATES} updates per request"}), 400
+        
+        listing_ids, stays, available = [], [], []
+        for i, update in enumerate(updates):
+            try:
+                listing_ids.append(int(update['id']))
+                stays.append((date.fromisoformat(update['check_in']), date.fromisoformat(update['check_out'])))
+                available.append(update.get('available', False))
+            except (KeyError, TypeError, ValueError, AttributeError):
+                return jsonify({"error": f"Update {i} needs an integer id and ISO check_in and check_out dates"}), 400
+            if not isinstance(available[-1], bool):
+                return jsonify({"error": f"Update {i}: available must be true or false"}), 400
+            if stays[-1][1] <= stays[-1][0]:
+                return jsonify({"error": f"Update {i}: check_out must be after check_in"}), 400
+        
+        try:
+            version = agent.update_calendar(listing_ids, stays, available)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        calendar = agent.index.calendar
+        return jsonify({
+            "success": True,
+            "updated": len(updates),
+            "version": version,
+            "calendar_start": calendar.start.isoformat(),
+            "calendar_days": calendar.days
+        })
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/cache', methods=['GET'])
+def cache_stats():
+    """Hit/miss counters for the query and result caches"""
     return jsonify({
         "success": True,
-        "listings": MOCK_LISTINGS,
-        "count": len(MOCK_LISTINGS)
+        "catalogue_version": agent.version,
+        "query_cache": query_cache.stats(),
+        "result_cache": result_cache.stats()
     })
 
 
+@app.route('/api/listings', methods=['GET'])
+def get_all_listings():
+    """Get available listings, a page at a time"""
+    try:
+        offset = max(0, request.args.get('offset', 0, type=int))
+        limit = min(max(1, request.args.get('limit', LISTINGS_PAGE_SIZE, type=int)), MAX_LISTINGS_PAGE_SIZE)
+        listings = agent.catalogue.page(offset, limit)
+        
+        return jsonify({
+            "success": True,
+            "listings": listings,
+            "count": len(listings),
+            "total": len(agent.catalogue)
+        })
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.cli.command('export-catalogue')
+@click.argument('backend', type=click.Choice(sorted(CATALOGUE_BACKENDS)))
+@click.argument('path')
+def export_catalogue(backend, path):
+    """Write the current catalogue to a SQLite or NDJSON catalogue file"""
+    CATALOGUE_BACKENDS[backend].write(agent.catalogue.records(), path)
+    click.echo(f"Wrote {len(agent.catalogue)} listings to {path}")
+
+
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
 
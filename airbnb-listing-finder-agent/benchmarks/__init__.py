@@ -0,0 +1,10 @@
+"""
+Benchmarks for the Airbnb Listing Finder Agent.
+
+    python -m benchmarks.parse_query --cities 5000
+    python -m benchmarks.search --listings 10000 100000 1000000
+    python -m benchmarks.shards --listings 1000000 --shards 1 2 4
+    python -m benchmarks.parity --listings 20000
+
+Run from the airbnb-listing-finder-agent directory.
+"""
@@ -0,0 +1,231 @@
+"""
+Parity check of the optimized search paths against an exhaustive ranking.
+
+Builds one seeded synthetic catalogue, query corpus and set of bookings,
+ranks every query by scoring the whole catalogue with ListingIndex.score
+and sorting all of it, and checks that each optimized path returns exactly
+that ranking at several limits. Stay dates are added to half the queries,
+and the reference checks them against plain sets of booked nights rather
+than the calendar bitsets. The paths compared are:
+
+- search: candidate pruning, chunked scoring and the bounded heap, on the
+  first page and on the page after it through a cursor
+- batch: search_batch as /api/search/batch runs it
+- matrix: search_batch with every query forced through _search_matrix,
+  which reads listings in blocks of descending rating and stops early
+- sharded: ShardedSearch with every query sent to the worker processes,
+  whose per-shard results are merged, on both pages; half the bookings
+  are made after the workers start, so they must arrive through shared memory
+
+Prints a JSON report and exits non-zero if any path disagrees.
+
+    python -m benchmarks.parity --listings 20000 --queries 300 --shards 2
+"""
+
+import argparse
+import json
+import random
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+
+import app
+from benchmarks import synthetic
+
+DEFAULT_LISTINGS = 20000
+DEFAULT_QUERIES = 300
+DEFAULT_SHARDS = 2
+LIMITS = (1, 10, 60)
+MAX_EXAMPLES = 5
+BOOKINGS_PER_LISTING = 3
+MAX_STAY_NIGHTS = 14
+
+# Broad queries that match most of the catalogue, so the matrix pass has to decide when to stop
+BROAD_QUERIES = ["anything with wifi", "luxury place", "cozy place with pool and hot tub", "2 bedroom under $300"]
+
+
+def generate_bookings(index, count, seed):
+    """Random (listing ids, stays, available) calendar updates, and the nights each position ends up booked
+    
+    Nights are day ordinals, kept only inside the calendar window since
+    nights outside it count as free.
+    """
+    rng = random.Random(seed)
+    start, days = index.calendar.start, index.calendar.days
+    window = range(start.toordinal(), start.toordinal() + days)
+    listing_ids, stays, available = [], [], []
+    booked = {}
+    for _ in range(count):
+        position = rng.randrange(index.size)
+        check_in = start + timedelta(rng.randint(-MAX_STAY_NIGHTS, days + MAX_STAY_NIGHTS))
+        check_out = check_in + timedelta(rng.randint(1, MAX_STAY_NIGHTS))
+        free = rng.random() < 0.2
+        listing_ids.append(int(index.ids[position]))
+        stays.append((check_in, check_out))
+        available.append(free)
+        
+        nights = {night for night in range(check_in.toordinal(), check_out.toordinal()) if night in window}
+        if free:
+            booked.get(position, set()).difference_update(nights)
+        else:
+            booked.setdefault(position, set()).update(nights)
+    return (listing_ids, stays, available), booked
+
+
+def dated_queries(queries, start, seed):
+    """queries with a stay such as "dec 20-jan 3" inside the calendar window added to every other one"""
+    rng = random.Random(seed)
+    dated = []
+    for i, query in enumerate(queries):
+        if i % 2:
+            check_in = start + timedelta(rng.randint(0, 360))
+            check_out = check_in + timedelta(rng.randint(1, MAX_STAY_NIGHTS))
+            query = f"{query} {check_in:%b} {check_in.day}-{check_out:%b} {check_out.day}"
+        dated.append(query)
+    return dated
+
+
+def reference_rank(index, criteria, limit, after=None, booked=None):
+    """Best (position, score) pairs from scoring every listing and sorting them all
+    
+    A stay is checked against booked, the set of booked night ordinals per
+    position, instead of the index calendar.
+    """
+    positions, scores = index.score(dict(criteria, check_in=None, check_out=None), slice(0, index.size), after)
+    if criteria.get("check_in"):
+        check_in, check_out = (date.fromisoformat(criteria[field]) for field in ("check_in", "check_out"))
+        stay = range(check_in.toordinal(), check_out.toordinal())
+        free = np.array([booked is None or booked.get(position, set()).isdisjoint(stay)
+                         for position in positions.tolist()], dtype=bool)
+        positions, scores = positions[free], scores[free]
+    order = np.lexsort((positions, -scores))[:limit]
+    return [(int(positions[i]), scores[i].item()) for i in order]
+
+
+def next_page(ranked):
+    """The (score, position) cursor after the last of ranked, or None if it is empty"""
+    return (ranked[-1][1], ranked[-1][0]) if ranked else None
+
+
+class Checks:
+    """Mismatch counts per path, with a few example queries for each"""
+    
+    def __init__(self):
+        self.compared = {}
+        self.mismatches = {}
+        self.examples = {}
+    
+    def compare(self, path, query, limit, expected, actual):
+        """Count one comparison for path, recording the query if actual differs"""
+        self.compared[path] = self.compared.get(path, 0) + 1
+        if actual != expected:
+            self.mismatches[path] = self.mismatches.get(path, 0) + 1
+            examples = self.examples.setdefault(path, [])
+            if len(examples) < MAX_EXAMPLES:
+                examples.append({"query": query, "limit": limit})
+    
+    def report(self):
+        """Per-path comparison and mismatch counts with the example queries"""
+        return {path: {"compared": count, "mismatches": self.mismatches.get(path, 0),
+                       "examples": self.examples.get(path, [])} for path, count in self.compared.items()}
+
+
+def check_search(index, queries, criteria_list, booked, checks):
+    """Single-query search, first page and the page after it"""
+    for query, criteria in zip(queries, criteria_list):
+        for limit in LIMITS:
+            expected = reference_rank(index, criteria, limit, booked=booked)
+            checks.compare("search", query, limit, expected, index.search(criteria, limit))
+            after = next_page(expected)
+            if after is not None:
+                checks.compare("search_cursor", query, limit, reference_rank(index, criteria, limit, after, booked),
+                               index.search(criteria, limit, after))
+
+
+def check_batch(index, queries, criteria_list, booked, checks):
+    """search_batch as served, then with every query forced through the matrix pass"""
+    full_scan_fraction = app.FULL_SCAN_FRACTION
+    for path, fraction in (("batch", full_scan_fraction), ("matrix", -1)):
+        app.FULL_SCAN_FRACTION = fraction  # Below zero no candidate list is selective enough
+        try:
+            for limit in LIMITS:
+                ranked, _ = index.search_batch(criteria_list, limit)
+                for query, criteria, actual in zip(queries, criteria_list, ranked):
+                    checks.compare(path, query, limit, reference_rank(index, criteria, limit, booked=booked), actual)
+        finally:
+            app.FULL_SCAN_FRACTION = full_scan_fraction
+
+
+def check_sharded(agent, queries, criteria_list, bookings, booked, checks):
+    """Sharded search with every query answered by the workers, first page and the page after it"""
+    shard_min_candidates = app.SHARD_MIN_CANDIDATES
+    app.SHARD_MIN_CANDIDATES = 0
+    try:
+        half = len(bookings[0]) // 2
+        agent.update_calendar(*(column[:half] for column in bookings))
+        searcher = agent.searcher
+        agent.update_calendar(*(column[half:] for column in bookings))
+        for query, criteria in zip(queries, criteria_list):
+            for limit in LIMITS:
+                expected = reference_rank(agent.index, criteria, limit, booked=booked)
+                checks.compare("sharded", query, limit, expected, searcher.search(criteria, limit))
+                after = next_page(expected)
+                if after is not None:
+                    checks.compare("sharded_cursor", query, limit,
+                                   reference_rank(agent.index, criteria, limit, after, booked),
+                                   searcher.search(criteria, limit, after))
+    finally:
+        app.SHARD_MIN_CANDIDATES = shard_min_candidates
+        agent.close()
+
+
+def run(listings=DEFAULT_LISTINGS, query_count=DEFAULT_QUERIES, seed=synthetic.DEFAULT_SEED, shards=DEFAULT_SHARDS):
+    """Compare every search path with the exhaustive ranking and return the report dict
+    
+    shards below 2 skips the sharded check.
+    """
+    vocab = synthetic.vocabulary()
+    catalogue = app.MemoryCatalogue(synthetic.generate_listings(listings, seed))
+    agent = app.AirbnbAgent(catalogue, vocab, shards=1)
+    bookings, booked = generate_bookings(agent.index, listings * BOOKINGS_PER_LISTING, seed)
+    agent.update_calendar(*bookings)
+    queries = dated_queries(synthetic.generate_queries(query_count, seed, vocab) + BROAD_QUERIES,
+                            agent.index.calendar.start, seed)
+    criteria_list = [agent.parse_query(query) for query in queries]
+    
+    checks = Checks()
+    check_search(agent.index, queries, criteria_list, booked, checks)
+    check_batch(agent.index, queries, criteria_list, booked, checks)
+    if shards > 1:
+        sharded = app.AirbnbAgent(catalogue, vocab, shards=shards)
+        check_sharded(sharded, queries, criteria_list, bookings, booked, checks)
+    return {
+        "listings": listings,
+        "queries": len(queries),
+        "dated_queries": sum(bool(criteria.get("check_in")) for criteria in criteria_list),
+        "bookings": len(bookings[0]),
+        "seed": seed,
+        "shards": shards,
+        "limits": list(LIMITS),
+        "checks": checks.report(),
+        "passed": not checks.mismatches
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check optimized search paths against an exhaustive ranking")
+    parser.add_argument("--listings", type=int, default=DEFAULT_LISTINGS)
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES)
+    parser.add_argument("--seed", type=int, default=synthetic.DEFAULT_SEED)
+    parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS, help="Worker processes for the sharded check")
+    args = parser.parse_args(argv)
+    report = run(args.listings, args.queries, args.seed, args.shards)
+    print(json.dumps(report, indent=2))
+    if not report["passed"]:
+        print("Search paths disagree with the exhaustive ranking", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Microbenchmark for AirbnbAgent.parse_query.
+
+Times the compiled single-pass QueryParser against the previous
+implementation, which rebuilt its vocabularies and ran one regex or
+substring scan per pattern and per vocabulary term for every query. The
+vocabulary can be padded with synthetic city names to show how each
+parser scales, and both parsers must agree on every query in the corpus.
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+
+import app
+
+DEFAULT_SEED = 42
+DEFAULT_REPEAT = 200
+SYLLABLES = ["ba", "del", "fort", "gran", "ha", "ka", "lin", "mar", "no", "port", "ri", "san", "ta", "vil", "wes", "zo"]
+
+QUERIES = [
+    "Find a cozy apartment in New York under $150",
+    "Find a beachfront villa in Miami with pool",
+    "2 bedroom apartment under $200",
+    "Luxury penthouse in Los Angeles",
+    "Cozy apartment in New York with WiFi and kitchen",
+    "Family-friendly house with 4 bedrooms",
+    "Mountain cabin in Aspen with hot tub and fireplace for 4 guests",
+    "$100-$250 place in Boston with parking and washer",
+    "Studio in San Francisco below $100",
+    "Something downtown for 6 people with a gym, more than $150",
+]
+
+
+def legacy_parse_query(query, vocabulary):
+    """parse_query as it was before the compiled parser, used as the baseline"""
+    query_lower = query.lower()
+    criteria = {
+        "location": None,
+        "max_price": None,
+        "min_price": None,
+        "bedrooms": None,
+        "guests": None,
+        "amenities": [],
+        "keywords": []
+    }
+    
+    locations = list(vocabulary["locations"])
+    for loc in locations:
+        if loc in query_lower:
+            criteria["location"] = loc.title()
+            break
+    
+    price_patterns = [
+        (r'under\s*\$?(\d+)', 'max_price'),
+        (r'less than\s*\$?(\d+)', 'max_price'),
+        (r'below\s*\$?(\d+)', 'max_price'),
+        (r'over\s*\$?(\d+)', 'min_price'),
+        (r'more than\s*\$?(\d+)', 'min_price'),
+        (r'above\s*\$?(\d+)', 'min_price'),
+        (r'\$?(\d+)\s*-\s*\$?(\d+)', 'range'),
+    ]
+    for pattern, ptype in price_patterns:
+        match = re.search(pattern, query_lower)
+        if match:
+            if ptype == 'max_price':
+                criteria["max_price"] = int(match.group(1))
+            elif ptype == 'min_price':
+                criteria["min_price"] = int(match.group(1))
+            elif ptype == 'range':
+                criteria["min_price"] = int(match.group(1))
+                criteria["max_price"] = int(match.group(2))
+    
+    bedroom_match = re.search(r'(\d+)\s*bedroom', query_lower)
+    if bedroom_match:
+        criteria["bedrooms"] = int(bedroom_match.group(1))
+    guest_match = re.search(r'(\d+)\s*(?:guest|people|person)', query_lower)
+    if guest_match:
+        criteria["guests"] = int(guest_match.group(1))
+    
+    amenity_keywords = dict(vocabulary["amenities"])
+    for keyword, amenity in amenity_keywords.items():
+        if keyword in query_lower:
+            criteria["amenities"].append(amenity)
+    keywords = list(vocabulary["keywords"])
+    for keyword in keywords:
+        if keyword in query_lower:
+            criteria["keywords"].append(keyword)
+    return criteria
+
+
+def synthetic_cities(count, seed):
+    """Return count distinct made-up city names"""
+    rng = random.Random(seed)
+    cities = set()
+    while len(cities) < count:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if rng.random() < 0.3:
+            name = f"{name} {rng.choice(['city', 'beach', 'springs', 'falls', 'harbor'])}"
+        cities.add(name)
+    return sorted(cities)
+
+
+def time_parser(parse, queries, repeat):
+    """Mean microseconds per query over repeat passes of the corpus"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            parse(query)
+    return (time.perf_counter() - started) / (repeat * len(queries)) * 1e6
+
+
+def run(city_counts, repeat=DEFAULT_REPEAT, seed=DEFAULT_SEED):
+    """Benchmark both parsers for each vocabulary size and return the report dict"""
+    base = app.load_vocabulary()
+    report = {"repeat": repeat, "queries": len(QUERIES), "results": []}
+    
+    for count in city_counts:
+        vocabulary = dict(base, locations=base["locations"] + synthetic_cities(count, seed))
+        queries = QUERIES + [f"{city} under $200 with pool" for city in vocabulary["locations"][-5:]]
+        
+        started = time.perf_counter()
+        parser = app.QueryParser(vocabulary)
+        compile_ms = (time.perf_counter() - started) * 1000
+        
+        # Fields added since, such as the radius search's near, have no legacy counterpart
+        for query in queries:
+            legacy = legacy_parse_query(query, vocabulary)
+            parsed = parser.parse(query)
+            if {field: parsed[field] for field in legacy} != legacy:
+                raise AssertionError(f"Parsers disagree on {query!r}")
+        
+        legacy_us = time_parser(lambda q: legacy_parse_query(q, vocabulary), queries, repeat)
+        compiled_us = time_parser(parser.parse, queries, repeat)
+        print(f"{len(vocabulary['locations'])} locations: legacy {legacy_us:.1f}us, "
+              f"compiled {compiled_us:.1f}us", file=sys.stderr)
+        report["results"].append({
+            "locations": len(vocabulary["locations"]),
+            "compile_ms": round(compile_ms, 3),
+            "legacy_us_per_query": round(legacy_us, 3),
+            "compiled_us_per_query": round(compiled_us, 3),
+            "speedup": round(legacy_us / compiled_us, 2)
+        })
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark AirbnbAgent.parse_query")
+    parser.add_argument("--cities", type=int, nargs="+", default=[0, 1000, 5000],
+                        help="Synthetic city names added to the shipped vocabulary")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.cities, args.repeat, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
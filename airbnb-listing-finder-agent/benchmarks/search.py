@@ -0,0 +1,169 @@
+"""
+Search benchmark for AirbnbAgent over synthetic catalogues.
+
+For each catalogue size this generates a seeded catalogue and query corpus
+(see benchmarks.synthetic), then times three stages separately:
+
+- parse_query: natural language to criteria, per query
+- search_listings: ranking and hydrating the parsed criteria, per query
+- /api/search: the full request through the Flask test client, starting
+  from empty search caches
+
+Each stage reports p50/p99 latency in milliseconds and throughput in
+queries per second. Index build time and process RSS are recorded per size.
+The report is JSON so runs can be diffed between commits.
+
+    python -m benchmarks.search --listings 10000 100000 1000000 --output search.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import app
+from benchmarks import synthetic
+
+DEFAULT_QUERIES = 500
+WARMUP_QUERIES = 20
+
+
+def rss_mb():
+    """Current resident set size of this process in MB, or None where unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * resource.getpagesize() / 2 ** 20, 1)
+    except (OSError, AttributeError):
+        return None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+
+
+def summarize(latencies):
+    """p50/p99/mean latency in ms and throughput for a list of per-query seconds"""
+    latencies = np.array(latencies) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "mean_ms": round(float(latencies.mean()), 3),
+        "throughput_qps": round(len(latencies) / (latencies.sum() / 1000), 1)
+    }
+
+
+def time_each(function, items):
+    """Call function on every item, returning the per-call seconds"""
+    latencies = []
+    for item in items:
+        started = time.perf_counter()
+        function(item)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def git_commit():
+    """Commit being benchmarked, if run from a git checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(count, queries, seed, vocab):
+    """Benchmark one catalogue size and return its results"""
+    started = time.perf_counter()
+    catalogue = app.MemoryCatalogue(synthetic.generate_listings(count, seed))
+    generate_s = time.perf_counter() - started
+    
+    agent = app.AirbnbAgent(catalogue, vocab)
+    started = time.perf_counter()
+    agent.index
+    index_s = time.perf_counter() - started
+    
+    # Warm lazily built index state (keyword columns, location postings) outside the timed runs
+    for query in queries[:WARMUP_QUERIES]:
+        agent.search_listings(agent.parse_query(query))
+    
+    parse = time_each(agent.parse_query, queries)
+    criteria = [agent.parse_query(query) for query in queries]
+    search = time_each(agent.search_listings, criteria)
+    
+    # End to end against empty caches, as a stream of new queries would see it
+    app.agent = agent
+    app.query_cache = app.SearchCache(app.QUERY_CACHE_MAX_BYTES, app.SEARCH_CACHE_TTL_SECONDS)
+    app.result_cache = app.SearchCache(app.RESULT_CACHE_MAX_BYTES, app.SEARCH_CACHE_TTL_SECONDS)
+    client = app.app.test_client()
+    
+    def request(query):
+        response = client.post("/api/search", json={"query": query})
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/search failed for {query!r}: {response.get_json()}")
+    
+    end_to_end = time_each(request, queries)
+    
+    result = {
+        "listings": count,
+        "generate_s": round(generate_s, 2),
+        "index_build_s": round(index_s, 3),
+        "rss_mb": rss_mb(),
+        "parse_query": summarize(parse),
+        "search_listings": summarize(search),
+        "api_search": dict(summarize(end_to_end), result_cache_hit_rate=round(app.result_cache.stats()["hit_rate"], 3))
+    }
+    print(f"{count} listings: parse p50 {result['parse_query']['p50_ms']}ms, "
+          f"search p50 {result['search_listings']['p50_ms']}ms p99 {result['search_listings']['p99_ms']}ms, "
+          f"api p50 {result['api_search']['p50_ms']}ms, rss {result['rss_mb']}MB", file=sys.stderr)
+    return result
+
+
+def run(sizes, query_count=DEFAULT_QUERIES, seed=synthetic.DEFAULT_SEED):
+    """Benchmark every catalogue size and return the report dict"""
+    vocab = synthetic.vocabulary()
+    queries = synthetic.generate_queries(query_count, seed, vocab)
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "seed": seed,
+        "queries": query_count,
+        "results": []
+    }
+    for count in sizes:
+        report["results"].append(run_size(count, queries, seed, vocab))
+        app.agent = None  # Let the previous catalogue be freed before building the next one
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark AirbnbAgent search over synthetic catalogues")
+    parser.add_argument("--listings", type=int, nargs="+", default=[10000, 100000, 1000000],
+                        help="Catalogue sizes to benchmark")
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES, help="Queries in the corpus")
+    parser.add_argument("--seed", type=int, default=synthetic.DEFAULT_SEED)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    report = json.dumps(run(args.listings, args.queries, args.seed), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Scaling benchmark for sharded search.
+
+Builds one seeded synthetic catalogue, then times search_listings over the
+query corpus with the search split across 1, 2, 4... shard processes. Broad
+queries, the ones with at least SHARD_MIN_CANDIDATES candidates, are what
+sharding parallelizes; selective queries stay in the calling process. Both
+are reported, along with the speedup of broad queries over one shard and
+the CPU count, since the speedup can not exceed the cores available.
+
+    python -m benchmarks.shards --listings 1000000 --shards 1 2 4 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import app
+from benchmarks import synthetic
+from benchmarks.search import git_commit, summarize, time_each
+
+DEFAULT_QUERIES = 300
+
+
+def candidate_count(index, criteria):
+    """Number of listings the index would score for criteria"""
+    candidates = index.candidates(criteria)
+    return candidates.stop - candidates.start if isinstance(candidates, slice) else len(candidates)
+
+
+def run(listings, shard_counts, query_count=DEFAULT_QUERIES, seed=synthetic.DEFAULT_SEED):
+    """Benchmark each shard count on the same catalogue and return the report dict"""
+    vocab = synthetic.vocabulary()
+    catalogue = app.MemoryCatalogue(synthetic.generate_listings(listings, seed))
+    queries = synthetic.generate_queries(query_count, seed, vocab)
+    
+    report = {
+        "commit": git_commit(),
+        "cpu_count": os.cpu_count(),
+        "listings": listings,
+        "queries": query_count,
+        "shard_min_candidates": app.SHARD_MIN_CANDIDATES,
+        "results": []
+    }
+    for shards in shard_counts:
+        agent = app.AirbnbAgent(catalogue, vocab, shards=shards)
+        agent.index
+        started = time.perf_counter()
+        agent.searcher
+        startup_s = time.perf_counter() - started
+        
+        criteria = [agent.parse_query(query) for query in queries]
+        broad = [c for c in criteria if candidate_count(agent.index, c) >= app.SHARD_MIN_CANDIDATES]
+        for c in (broad or criteria)[:10]:
+            agent.search_listings(c)  # Start the workers and warm their caches
+        
+        result = {
+            "shards": shards,
+            "startup_s": round(startup_s, 3),
+            "broad_queries": len(broad),
+            "all": summarize(time_each(agent.search_listings, criteria)),
+            "broad": summarize(time_each(agent.search_listings, broad)) if broad else None
+        }
+        agent.close()
+        report["results"].append(result)
+        print(f"{shards} shards: broad p50 {result['broad'] and result['broad']['p50_ms']}ms, "
+              f"all p50 {result['all']['p50_ms']}ms", file=sys.stderr)
+    
+    single = report["results"][0]["broad"]
+    for result in report["results"]:
+        if single and result["broad"]:
+            result["broad_speedup"] = round(single["mean_ms"] / result["broad"]["mean_ms"], 2)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sharded search scaling")
+    parser.add_argument("--listings", type=int, default=1000000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES)
+    parser.add_argument("--seed", type=int, default=synthetic.DEFAULT_SEED)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.listings, args.shards, args.queries, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Seeded synthetic catalogues and query corpora for benchmarking AirbnbAgent.
+
+Listings are spread over a few dozen cities with their own coordinates,
+price levels and settings (beach, mountain, urban), so amenities, prices
+and keywords cluster the way they do in a real catalogue rather than being
+uniform noise. The query corpus mixes the phrasings the parser understands:
+locations, radius searches, price limits and ranges, bedrooms, guests,
+amenities and keywords. The same seed always produces the same data.
+
+    python -m benchmarks.synthetic --listings 100000 --backend ndjson --output listings.ndjson
+"""
+
+import argparse
+import random
+import sys
+
+import app
+
+DEFAULT_SEED = 42
+
+# name, state, latitude, longitude, price multiplier, setting
+CITIES = [
+    ("New York", "NY", 40.7128, -74.006, 1.6, "urban"),
+    ("Miami", "FL", 25.7617, -80.1918, 1.3, "beach"),
+    ("Aspen", "CO", 39.1911, -106.8175, 2.0, "mountain"),
+    ("Los Angeles", "CA", 34.0522, -118.2437, 1.4, "beach"),
+    ("San Francisco", "CA", 37.7749, -122.4194, 1.6, "urban"),
+    ("Orlando", "FL", 28.5384, -81.3789, 0.9, "urban"),
+    ("Boston", "MA", 42.3601, -71.0589, 1.3, "urban"),
+    ("Chicago", "IL", 41.8781, -87.6298, 1.1, "urban"),
+    ("Seattle", "WA", 47.6062, -122.3321, 1.2, "urban"),
+    ("Austin", "TX", 30.2672, -97.7431, 1.0, "urban"),
+    ("Denver", "CO", 39.7392, -104.9903, 0.9, "mountain"),
+    ("Nashville", "TN", 36.1627, -86.7816, 1.0, "urban"),
+    ("New Orleans", "LA", 29.9511, -90.0715, 1.0, "urban"),
+    ("San Diego", "CA", 32.7157, -117.1611, 1.3, "beach"),
+    ("Honolulu", "HI", 21.3069, -157.8583, 1.5, "beach"),
+    ("Las Vegas", "NV", 36.1699, -115.1398, 0.9, "urban"),
+    ("Portland", "OR", 45.5152, -122.6784, 0.9, "urban"),
+    ("Portland", "ME", 43.6591, -70.2568, 0.9, "beach"),
+    ("Charleston", "SC", 32.7765, -79.9311, 1.1, "beach"),
+    ("Savannah", "GA", 32.0809, -81.0912, 0.9, "urban"),
+    ("Phoenix", "AZ", 33.4484, -112.074, 0.8, "urban"),
+    ("Scottsdale", "AZ", 33.4942, -111.9261, 1.2, "urban"),
+    ("Park City", "UT", 40.6461, -111.498, 1.7, "mountain"),
+    ("Lake Tahoe", "CA", 39.0968, -120.0324, 1.4, "mountain"),
+    ("Jackson", "WY", 43.4799, -110.7624, 1.8, "mountain"),
+    ("Asheville", "NC", 35.5951, -82.5515, 0.8, "mountain"),
+    ("Key West", "FL", 24.5551, -81.78, 1.5, "beach"),
+    ("Myrtle Beach", "SC", 33.6891, -78.8867, 0.7, "beach"),
+    ("Outer Banks", "NC", 35.5582, -75.4665, 0.9, "beach"),
+    ("Santa Fe", "NM", 35.687, -105.9378, 0.9, "mountain"),
+    ("Sedona", "AZ", 34.8697, -111.761, 1.2, "mountain"),
+    ("Napa", "CA", 38.2975, -122.2869, 1.6, "urban"),
+    ("Washington", "DC", 38.9072, -77.0369, 1.3, "urban"),
+    ("Philadelphia", "PA", 39.9526, -75.1652, 1.0, "urban"),
+    ("Atlanta", "GA", 33.749, -84.388, 0.9, "urban"),
+    ("Minneapolis", "MN", 44.9778, -93.265, 0.8, "urban"),
+    ("Salt Lake City", "UT", 40.7608, -111.891, 0.8, "mountain"),
+    ("Anchorage", "AK", 61.2181, -149.9003, 0.9, "mountain"),
+    ("Galveston", "TX", 29.3013, -94.7977, 0.7, "beach"),
+    ("Cape Cod", "MA", 41.6688, -70.2962, 1.2, "beach"),
+]
+
+# type, nightly base price, bedroom range, guests per bedroom
+PROPERTY_TYPES = [
+    ("Apartment", 110, (1, 3), 2),
+    ("Studio", 80, (0, 0), 2),
+    ("Loft", 140, (1, 2), 2),
+    ("Condo", 130, (1, 3), 2),
+    ("House", 180, (2, 5), 2),
+    ("Villa", 350, (3, 6), 2),
+    ("Cabin", 160, (1, 4), 2),
+    ("Cottage", 130, (1, 3), 2),
+    ("Penthouse", 450, (2, 4), 2),
+    ("Bungalow", 120, (1, 3), 2),
+]
+
+# Probability of each amenity, overall and by setting
+AMENITIES = {
+    "WiFi": 0.95, "Kitchen": 0.85, "Washer": 0.55, "Air Conditioning": 0.5, "Parking": 0.45, "TV": 0.6,
+    "Dryer": 0.35, "Workspace": 0.3, "Pool": 0.15, "Gym": 0.12, "Hot Tub": 0.1, "Fireplace": 0.12,
+    "Balcony": 0.25, "Rooftop": 0.06, "Concierge": 0.04, "EV Charger": 0.05, "Pet Friendly": 0.2,
+}
+SETTING_AMENITIES = {
+    "beach": {"Beach Access": 0.6, "Pool": 0.4, "Balcony": 0.45},
+    "mountain": {"Fireplace": 0.55, "Hot Tub": 0.45, "Mountain View": 0.6, "Parking": 0.75},
+    "urban": {"Gym": 0.25, "Rooftop": 0.12, "Concierge": 0.1, "Workspace": 0.45},
+}
+SETTING_WORDS = {
+    "beach": ["beachfront", "oceanview", "sunny", "coastal"],
+    "mountain": ["mountain", "rustic", "secluded", "alpine"],
+    "urban": ["downtown", "modern", "central", "stylish"],
+}
+ADJECTIVES = ["cozy", "luxury", "family", "bright", "charming", "spacious", "quiet", "renovated"]
+DESCRIPTIONS = [
+    "{adjective} {type} with {amenity} close to everything {city} has to offer.",
+    "A {word} {type} sleeping {guests}, with {amenity} and easy parking nearby.",
+    "Stay in this {word} retreat: {bedrooms} bedrooms, {amenity} and a fully equipped space.",
+    "{adjective} and {word}, this {type} is ideal for families and small groups.",
+]
+IMAGES = [listing["image"] for listing in app.MOCK_LISTINGS]
+
+QUERY_TEMPLATES = [
+    ("{type} in {city}", 3),
+    ("{keyword} {type} in {city} under ${price}", 4),
+    ("{type} in {city} with {amenity} and {amenity2}", 3),
+    ("{bedrooms} bedroom {type} in {city} for {guests} guests", 2),
+    ("${low}-${high} place in {city} with {amenity}", 2),
+    ("{keyword} {type} near {place}", 2),
+    ("{type} within {radius} miles of {place} with {amenity}", 1),
+    ("something {keyword} with {amenity} over ${price}", 1),
+    ("{bedrooms} bedroom {type} under ${price}", 2),
+    ("{keyword} place for {guests} people with {amenity}", 1),
+]
+
+
+def city_label(city):
+    """Listing location text for a CITIES entry, such as Boston, MA"""
+    return f"{city[0]}, {city[1]}"
+
+
+def vocabulary(base=None):
+    """The shipped vocabulary with every synthetic city added as a location"""
+    base = app.load_vocabulary() if base is None else base
+    locations = list(base["locations"])
+    for city in CITIES:
+        name = city[0].lower()
+        if name not in locations:
+            locations.append(name)
+    return dict(base, locations=locations)
+
+
+def generate_listings(count, seed=DEFAULT_SEED):
+    """Yield count listing dicts shaped like MOCK_LISTINGS, with ids 1..count"""
+    rng = random.Random(seed)
+    city_weights = [1 / (rank + 1) ** 0.6 for rank in range(len(CITIES))]
+    for listing_id in range(1, count + 1):
+        city = rng.choices(CITIES, city_weights)[0]
+        name, state, latitude, longitude, multiplier, setting = city
+        kind, base_price, (fewest, most), per_bedroom = rng.choice(PROPERTY_TYPES)
+        bedrooms = rng.randint(fewest, most)
+        guests = max(1, bedrooms * per_bedroom + rng.randint(-1, 2))
+        
+        # Log-normal spread around the city and property price level, with a few budget and luxury outliers
+        price = base_price * multiplier * (1 + 0.25 * bedrooms) * rng.lognormvariate(0, 0.35)
+        price = int(min(max(price, 25), 5000))
+        rating = round(min(5.0, max(1.0, rng.gauss(4.6, 0.35))), 1)
+        reviews = int(rng.expovariate(1 / 80))
+        
+        odds = dict(AMENITIES, **SETTING_AMENITIES[setting])
+        amenities = [amenity for amenity, chance in odds.items() if rng.random() < chance]
+        adjective = rng.choice(ADJECTIVES)
+        word = rng.choice(SETTING_WORDS[setting])
+        title = f"{adjective.title()} {word.title()} {kind}"
+        description = rng.choice(DESCRIPTIONS).format(
+            adjective=adjective.capitalize(), type=kind.lower(), word=word, city=name, guests=guests,
+            bedrooms=bedrooms, amenity=(rng.choice(amenities) if amenities else "WiFi").lower()
+        )
+        
+        yield {
+            "id": listing_id,
+            "title": title,
+            "location": city_label(city),
+            "latitude": round(latitude + rng.gauss(0, 0.04), 5),
+            "longitude": round(longitude + rng.gauss(0, 0.04), 5),
+            "price": price,
+            "rating": rating,
+            "reviews": reviews,
+            "bedrooms": bedrooms,
+            "bathrooms": max(1, bedrooms - rng.randint(0, 1)),
+            "guests": guests,
+            "amenities": amenities,
+            "image": rng.choice(IMAGES),
+            "description": description
+        }
+
+
+def generate_queries(count, seed=DEFAULT_SEED, vocab=None):
+    """Return count natural-language queries drawn from the corpus templates"""
+    rng = random.Random(seed)
+    vocab = vocabulary() if vocab is None else vocab
+    amenity_terms = list(vocab["amenities"])
+    places = list(vocab["places"])
+    templates, weights = zip(*QUERY_TEMPLATES)
+    queries = []
+    for _ in range(count):
+        low = rng.randrange(50, 300, 10)
+        amenity, amenity2 = rng.sample(amenity_terms, 2)
+        query = rng.choices(templates, weights)[0].format(
+            type=rng.choice(PROPERTY_TYPES)[0].lower(),
+            city=rng.choice(CITIES)[0],
+            keyword=rng.choice(vocab["keywords"]),
+            price=rng.randrange(60, 600, 10),
+            amenity=amenity,
+            amenity2=amenity2,
+            bedrooms=rng.randint(1, 4),
+            guests=rng.randint(2, 8),
+            low=low,
+            high=low + rng.randrange(50, 300, 10),
+            place=rng.choice(places).title(),
+            radius=rng.choice([1, 2, 3, 5, 10])
+        )
+        queries.append(query[0].upper() + query[1:])
+    return queries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic listing catalogue")
+    parser.add_argument("--listings", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--backend", choices=sorted(app.CATALOGUE_BACKENDS), default="ndjson")
+    parser.add_argument("--output", required=True, help="Catalogue file to create")
+    args = parser.parse_args(argv)
+    app.CATALOGUE_BACKENDS[args.backend].write(generate_listings(args.listings, args.seed), args.output)
+    print(f"Wrote {args.listings} listings to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
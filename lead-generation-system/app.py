@@ -1,28 +1,429 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, g, has_app_context
 from flask_cors import CORS
-from datetime import datetime
+import click
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
+import functools
+import logging
+import time
+import zlib
 import sqlite3
 import os
+import json
+import base64
+import tempfile
+import csv
+import io
+import re
+import queue
+import threading
 import openpyxl
 from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.utils import get_column_letter
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for frontend
+CORS(app, expose_headers=['X-Next-Cursor'])  # Enable CORS for frontend
 
 # Database configuration
 DATABASE = 'leads.db'
+DB_POOL_SIZE = 8
+DB_POOL_TIMEOUT = 30
+DB_BUSY_TIMEOUT_MS = 5000
+DB_CACHE_SIZE_KB = 20000
+DB_STATEMENT_CACHE_SIZE = 256
+
+# Columns of the leads table, in schema order
+LEAD_COLUMNS = (
+    'id', 'first_name', 'last_name', 'email', 'phone', 'company',
+    'job_title', 'industry', 'lead_source', 'address', 'city', 'state',
+    'country', 'zip_code', 'notes', 'status', 'created_at', 'updated_at'
+)
+
+# Listing configuration
+LIST_FILTER_COLUMNS = ('status', 'lead_source', 'industry')
+LEADS_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Search configuration
+SEARCH_COLUMNS = ('first_name', 'last_name', 'email', 'company', 'job_title', 'city', 'notes')
+SEARCH_PAGE_SIZE = 50
+
+# Analytics configuration
+STATS_GROUP_COLUMNS = ('status', 'lead_source', 'industry')
+STATS_BUCKETS = {
+    'day': 'day',
+    'week': "date(day, 'weekday 0', '-6 days')",
+    'month': 'substr(day, 1, 7)',
+    'year': 'substr(day, 1, 4)',
+}
+STATS_KEY_SQL = (
+    "substr({row}.created_at, 1, 10), {row}.status, "
+    "{row}.lead_source, COALESCE({row}.industry, '')"
+)
+STATS_INCREMENT_SQL = (
+    "INSERT INTO lead_stats (day, status, lead_source, industry, count) "
+    "VALUES (" + STATS_KEY_SQL + ", 1) "
+    "ON CONFLICT (day, status, lead_source, industry) DO UPDATE SET count = count + 1;"
+)
+STATS_MATCH_SQL = (
+    "day = substr({row}.created_at, 1, 10) AND status = {row}.status AND "
+    "lead_source = {row}.lead_source AND industry = COALESCE({row}.industry, '')"
+)
+STATS_DECREMENT_SQL = (
+    "UPDATE lead_stats SET count = count - 1 WHERE " + STATS_MATCH_SQL + ";"
+    "DELETE FROM lead_stats WHERE count <= 0 AND " + STATS_MATCH_SQL + ";"
+)
+
+# Duplicate detection configuration
+DEDUP_KEY_COLUMNS = {'email': 'email_key', 'phone': 'phone_key', 'name': 'name_key'}
+DEDUP_BACKFILL_BATCH_SIZE = 10000
+PHONE_KEY_DIGITS = 10
+DUPLICATES_PAGE_SIZE = 100
+
+# Response cache configuration
+RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+CACHED_HEADERS = ('X-Next-Cursor',)
+
+# Metrics configuration
+METRICS_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SLOW_QUERY_MS = 100
+
+# Archive configuration
+ARCHIVE_STATUSES = ('Lost',)
+ARCHIVE_AFTER_DAYS = 180
+ARCHIVE_BATCH_SIZE = 1000
+ARCHIVE_COLUMNS = LEAD_COLUMNS + ('email_key', 'phone_key', 'name_key')
+
+# Lead creation configuration
+REQUIRED_FIELDS = ('first_name', 'last_name', 'email', 'phone', 'lead_source', 'status')
+INSERT_LEAD_SQL = '''
+    INSERT INTO leads (
+        first_name, last_name, email, phone, company, job_title,
+        industry, lead_source, address, city, state, country,
+        zip_code, notes, status, created_at, updated_at,
+        email_key, phone_key, name_key
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+UPDATE_LEAD_SQL = '''
+    UPDATE leads SET
+        first_name = ?, last_name = ?, email = ?, phone = ?,
+        company = ?, job_title = ?, industry = ?, lead_source = ?,
+        address = ?, city = ?, state = ?, country = ?,
+        zip_code = ?, notes = ?, status = ?, updated_at = ?,
+        email_key = ?, phone_key = ?, name_key = ?
+    WHERE id = ?
+'''
+LEAD_FIELD_ALIASES = {
+    'firstName': 'first_name', 'lastName': 'last_name', 'jobTitle': 'job_title',
+    'leadSource': 'lead_source', 'zipCode': 'zip_code'
+}
+PATCH_COLUMNS = LEAD_COLUMNS[1:-2]
+MAX_PATCH_IDS = 50000
+BULK_BATCH_SIZE = 1000
+MAX_BULK_BATCH_SIZE = 10000
+MAX_BULK_ERRORS = 1000
+
+# Export configuration
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_HEADERS = (
+    'ID', 'First Name', 'Last Name', 'Email', 'Phone', 'Company',
+    'Job Title', 'Industry', 'Lead Source', 'Address', 'City',
+    'State', 'Country', 'Zip Code', 'Notes', 'Status', 'Created At', 'Updated At'
+)
+STREAM_EXPORT_MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# ===== Instrumentation =====
+class Histogram:
+    """Cumulative-bucket latency histogram keyed by a tuple of label values"""
+    
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.series = {}
+    
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * len(self.buckets), 0.0, 0]
+        counts = series[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+class Metrics:
+    """Process-wide request and SQL metrics, rendered in Prometheus text format"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.requests = {}
+        self.request_latency = Histogram(METRICS_LATENCY_BUCKETS)
+        self.sql_latency = Histogram(METRICS_LATENCY_BUCKETS)
+        self.sql_rows = {}
+        self.slow_queries = {}
+    
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+    
+    def request_finished(self):
+        with self._lock:
+            self.in_flight -= 1
+    
+    def observe_request(self, method, route, status, seconds):
+        with self._lock:
+            key = (method, route, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.request_latency.observe((method, route), seconds)
+    
+    def observe_statement(self, statement, seconds, rows):
+        with self._lock:
+            self.sql_latency.observe((statement,), seconds)
+            if rows > 0:
+                self.sql_rows[statement] = self.sql_rows.get(statement, 0) + rows
+            if seconds * 1000 >= SLOW_QUERY_MS:
+                self.slow_queries[statement] = self.slow_queries.get(statement, 0) + 1
+    
+    def observe_rows(self, statement, rows):
+        if rows:
+            with self._lock:
+                self.sql_rows[statement] = self.sql_rows.get(statement, 0) + rows
+    
+    def render(self, extra=()):
+        """Return all metrics in the Prometheus text exposition format"""
+        lines = []
+        
+        def header(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+        
+        def labels(names, values, **extra_labels):
+            pairs = list(zip(names, values)) + list(extra_labels.items())
+            return '{' + ','.join(f'{k}="{escape_label(v)}"' for k, v in pairs) + '}'
+        
+        def histogram(name, help_text, hist, names):
+            header(name, 'histogram', help_text)
+            for values, (counts, total, count) in sorted(hist.series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(hist.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{labels(names, values, le=bound)} {cumulative}')
+                lines.append(f'{name}_bucket{labels(names, values, le="+Inf")} {count}')
+                lines.append(f'{name}_sum{labels(names, values)} {total}')
+                lines.append(f'{name}_count{labels(names, values)} {count}')
+        
+        def counter(name, help_text, values, names):
+            header(name, 'counter', help_text)
+            for key, value in sorted(values.items()):
+                key = key if isinstance(key, tuple) else (key,)
+                lines.append(f'{name}{labels(names, key)} {value}')
+        
+        with self._lock:
+            header('lead_api_requests_in_flight', 'gauge', 'Requests currently being handled.')
+            lines.append(f'lead_api_requests_in_flight {self.in_flight}')
+            counter('lead_api_requests_total', 'Requests handled.',
+                    self.requests, ('method', 'route', 'status'))
+            histogram('lead_api_request_duration_seconds', 'Request handling time.',
+                      self.request_latency, ('method', 'route'))
+            histogram('lead_api_sql_duration_seconds', 'SQL statement execution time.',
+                      self.sql_latency, ('statement',))
+            counter('lead_api_sql_rows_total', 'Rows returned or changed by SQL statements.',
+                    self.sql_rows, ('statement',))
+            counter('lead_api_sql_slow_queries_total',
+                    f'SQL statements slower than {SLOW_QUERY_MS} ms.',
+                    self.slow_queries, ('statement',))
+        
+        for name, kind, help_text, value in extra:
+            header(name, kind, help_text)
+            lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+def escape_label(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+metrics = Metrics()
+sql_logger = logging.getLogger('lead_api.sql')
+
+@functools.lru_cache(maxsize=1024)
+def statement_label(sql):
+    """Low-cardinality label for a SQL statement: its verb and main table"""
+    words = sql.split(None, 1)
+    verb = words[0].upper() if words else ''
+    table = re.search(r'\b(?:FROM|INTO|UPDATE|TABLE|ON)\s+(?:\w+\.)?(\w+)', sql, re.IGNORECASE)
+    return f'{verb} {table.group(1)}' if table else verb
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that records execution time and row counts for every statement"""
+    
+    def execute(self, sql, parameters=()):
+        return self._timed(super().execute, sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(super().executemany, sql, seq_of_parameters)
+    
+    def _timed(self, method, sql, parameters):
+        self._statement = statement_label(sql)
+        started = time.perf_counter()
+        try:
+            return method(sql, parameters)
+        finally:
+            elapsed = time.perf_counter() - started
+            # rowcount is only known for data-changing statements
+            rows = self.rowcount
+            metrics.observe_statement(self._statement, elapsed, rows)
+            if elapsed * 1000 >= SLOW_QUERY_MS:
+                sql_logger.warning('Slow query (%.1f ms, rowcount %d): %s',
+                                   elapsed * 1000, rows, ' '.join(sql.split()))
+            elif sql_logger.isEnabledFor(logging.DEBUG):
+                sql_logger.debug('%.3f ms, rowcount %d: %s',
+                                 elapsed * 1000, rows, ' '.join(sql.split()))
+    
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            metrics.observe_rows(self._statement, 1)
+        return row
+    
+    def fetchmany(self, *args, **kwargs):
+        rows = super().fetchmany(*args, **kwargs)
+        metrics.observe_rows(self._statement, len(rows))
+        return rows
+    
+    def fetchall(self):
+        rows = super().fetchall()
+        metrics.observe_rows(self._statement, len(rows))
+        return rows
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose statements all run through InstrumentedCursor"""
+    
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+    
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+@app.before_request
+def start_request_timer():
+    """Record the request start time and count it as in flight"""
+    g.request_started = time.perf_counter()
+    metrics.request_started()
+
+@app.after_request
+def record_request_metrics(response):
+    """Record latency and status for the matched route"""
+    started = g.get('request_started')
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe_request(
+            request.method, route, response.status_code, time.perf_counter() - started
+        )
+    return response
+
+@app.teardown_request
+def finish_request(exc):
+    """Stop counting the request as in flight, even if it raised"""
+    if g.pop('request_started', None) is not None:
+        metrics.request_finished()
 
 # ===== Database Functions =====
-def get_db_connection():
-    """Create and return a database connection"""
-    conn = sqlite3.connect(DATABASE)
+class ConnectionPool:
+    """Bounded pool of tuned SQLite connections for the current process"""
+    
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._reset()
+    
+    def _reset(self):
+        # Connections inherited across a fork must never be shared with the
+        # parent, so a new process starts with an empty pool
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._created = 0
+    
+    def acquire(self):
+        """Take an idle connection, opening a new one while under the size limit"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            idle = self._idle
+            if idle.empty() and self._created < self.size:
+                conn = connect_db(check_same_thread=False)
+                self._created += 1
+                return conn
+        try:
+            return idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RuntimeError('Timed out waiting for a database connection')
+    
+    def release(self, conn):
+        """Return a connection to the pool, rolling back any open transaction"""
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if self._pid == os.getpid():
+                self._idle.put(conn)
+
+def connect_db(**kwargs):
+    """Open a new database connection with the tuned pragmas applied"""
+    conn = sqlite3.connect(
+        DATABASE,
+        timeout=DB_BUSY_TIMEOUT_MS / 1000,
+        cached_statements=DB_STATEMENT_CACHE_SIZE,
+        factory=InstrumentedConnection,
+        **kwargs
+    )
     conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute(f'PRAGMA cache_size = -{DB_CACHE_SIZE_KB}')
+    conn.execute(f'PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}')
+    conn.execute('ATTACH DATABASE ? AS archive', (archive_database_path(),))
+    conn.execute('PRAGMA archive.journal_mode = WAL')
+    conn.execute('PRAGMA archive.synchronous = NORMAL')
+    conn.create_function('email_key', 1, email_key, deterministic=True)
+    conn.create_function('phone_key', 1, phone_key, deterministic=True)
+    conn.create_function('name_key', 2, name_key, deterministic=True)
     return conn
 
+def archive_database_path():
+    """Path of the cold archive database that sits next to DATABASE"""
+    root, ext = os.path.splitext(DATABASE)
+    return f'{root}_archive{ext or ".db"}'
+
+def get_db_connection():
+    """Return a database connection.
+    
+    Inside a request the connection is borrowed from the pool once and
+    returned when the app context ends, so handlers must not close it.
+    Outside a request a dedicated connection is opened for the caller to close.
+    """
+    if not has_app_context():
+        return connect_db()
+    if 'db' not in g:
+        g.db = db_pool.acquire()
+    return g.db
+
+@app.teardown_appcontext
+def release_db_connection(exc):
+    """Return the request's connection to the pool"""
+    conn = g.pop('db', None)
+    if conn is not None:
+        db_pool.release(conn)
+
 def init_db():
     """Initialize the database with the leads table"""
-    conn = get_db_connection()
+    conn = connect_db()
     conn.execute('''
         CREATE TABLE IF NOT EXISTS leads (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -42,13 +443,759 @@ def init_db():
             notes TEXT,
             status TEXT NOT NULL DEFAULT 'New',
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            email_key TEXT,
+            phone_key TEXT,
+            name_key TEXT
+        )
+    ''')
+    
+    # Normalized duplicate-detection keys, added to databases created
+    # before they existed and backfilled in batches
+    existing = {row['name'] for row in conn.execute('PRAGMA table_info(leads)')}
+    for column in DEDUP_KEY_COLUMNS.values():
+        if column not in existing:
+            conn.execute(f'ALTER TABLE leads ADD COLUMN {column} TEXT')
+    while True:
+        rows = conn.execute('''
+            SELECT id, email, phone, first_name, last_name FROM leads
+            WHERE email_key IS NULL LIMIT ?
+        ''', (DEDUP_BACKFILL_BATCH_SIZE,)).fetchall()
+        if not rows:
+            break
+        conn.executemany(
+            'UPDATE leads SET email_key = ?, phone_key = ?, name_key = ? WHERE id = ?',
+            [dedup_keys(row) + (row['id'],) for row in rows]
+        )
+    for column in DEDUP_KEY_COLUMNS.values():
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_leads_{column} ON leads ({column})')
+    
+    # Secondary indexes backing keyset pagination on (created_at, id),
+    # alone and combined with each equality filter
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_leads_created ON leads (created_at, id)')
+    for column in LIST_FILTER_COLUMNS:
+        conn.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_leads_{column}_created
+            ON leads ({column}, created_at, id)
+        ''')
+    
+    # Full-text index over the searchable columns, kept in sync by triggers
+    fts_exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'leads_fts'"
+    ).fetchone()
+    columns = ', '.join(SEARCH_COLUMNS)
+    new_columns = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+    old_columns = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS leads_fts USING fts5(
+            {columns}, content='leads', content_rowid='id', prefix='2 3'
+        )
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS leads_fts_insert AFTER INSERT ON leads BEGIN
+            INSERT INTO leads_fts (rowid, {columns}) VALUES (new.id, {new_columns});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS leads_fts_delete AFTER DELETE ON leads BEGIN
+            INSERT INTO leads_fts (leads_fts, rowid, {columns}) VALUES ('delete', old.id, {old_columns});
+        END
+    ''')
+    # Only edits to indexed columns touch the index. Recreated on every start
+    # so existing databases pick up the column list, which follows SEARCH_COLUMNS
+    conn.execute('DROP TRIGGER IF EXISTS leads_fts_update')
+    conn.execute(f'''
+        CREATE TRIGGER leads_fts_update AFTER UPDATE OF {columns} ON leads BEGIN
+            INSERT INTO leads_fts (leads_fts, rowid, {columns}) VALUES ('delete', old.id, {old_columns});
+            INSERT INTO leads_fts (rowid, {columns}) VALUES (new.id, {new_columns});
+        END
+    ''')
+    if not fts_exists:
+        # Index leads that were stored before full-text search existed
+        conn.execute("INSERT INTO leads_fts (leads_fts) VALUES ('rebuild')")
+    
+    # Cold archive of old leads in the attached archive database, with its
+    # own full-text index so search can fall through to it
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS archive.leads (
+            id INTEGER PRIMARY KEY,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            phone TEXT NOT NULL,
+            company TEXT,
+            job_title TEXT,
+            industry TEXT,
+            lead_source TEXT NOT NULL,
+            address TEXT,
+            city TEXT,
+            state TEXT,
+            country TEXT,
+            zip_code TEXT,
+            notes TEXT,
+            status TEXT NOT NULL,
+            created_at TIMESTAMP,
+            updated_at TIMESTAMP,
+            email_key TEXT,
+            phone_key TEXT,
+            name_key TEXT,
+            archived_at TIMESTAMP NOT NULL
         )
     ''')
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS archive.leads_fts USING fts5(
+            {columns}, content='leads', content_rowid='id', prefix='2 3'
+        )
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS archive.leads_fts_insert AFTER INSERT ON leads BEGIN
+            INSERT INTO leads_fts (rowid, {columns}) VALUES (new.id, {new_columns});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS archive.leads_fts_delete AFTER DELETE ON leads BEGIN
+            INSERT INTO leads_fts (leads_fts, rowid, {columns}) VALUES ('delete', old.id, {old_columns});
+        END
+    ''')
+    
+    # Supports the archive policy scan over the hot table
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_leads_status_updated ON leads (status, updated_at)')
+    
+    # Analytics rollup of lead counts per day, status, source and industry,
+    # maintained by triggers so every write path keeps it current
+    stats_exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'lead_stats'"
+    ).fetchone()
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS lead_stats (
+            day TEXT NOT NULL,
+            status TEXT NOT NULL,
+            lead_source TEXT NOT NULL,
+            industry TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (day, status, lead_source, industry)
+        ) WITHOUT ROWID
+    ''')
+    increment = STATS_INCREMENT_SQL.format(row='new')
+    decrement = STATS_DECREMENT_SQL.format(row='old')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS lead_stats_insert AFTER INSERT ON leads BEGIN
+            {increment}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS lead_stats_delete AFTER DELETE ON leads BEGIN
+            {decrement}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS lead_stats_update
+        AFTER UPDATE OF status, lead_source, industry, created_at ON leads BEGIN
+            {decrement}
+            {increment}
+        END
+    ''')
+    if not stats_exists:
+        rebuild_lead_stats(conn)
+    
+    # Single-row counter bumped by every write, used for HTTP validators
+    # and to key the response cache
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL,
+            modified_at TEXT NOT NULL
+        )
+    ''')
+    conn.execute(
+        'INSERT OR IGNORE INTO data_version (id, version, modified_at) VALUES (1, 0, ?)',
+        (datetime.now(timezone.utc).isoformat(),)
+    )
     conn.commit()
     conn.close()
     print("Database initialized successfully")
 
+db_pool = ConnectionPool(DB_POOL_SIZE, DB_POOL_TIMEOUT)
+
+def rebuild_lead_stats(conn):
+    """Recompute the lead_stats rollup from the hot and archived leads"""
+    conn.execute('DELETE FROM lead_stats')
+    conn.execute(f'''
+        INSERT INTO lead_stats (day, status, lead_source, industry, count)
+        SELECT {STATS_KEY_SQL.format(row='leads')}, COUNT(*)
+        FROM (
+            SELECT created_at, status, lead_source, industry FROM main.leads
+            UNION ALL
+            SELECT created_at, status, lead_source, industry FROM archive.leads
+        ) AS leads
+        GROUP BY 1, 2, 3, 4
+    ''')
+
+@app.cli.command('rebuild-stats')
+def rebuild_stats_command():
+    """Recompute the lead analytics rollup from scratch"""
+    init_db()
+    conn = connect_db()
+    rebuild_lead_stats(conn)
+    bump_data_version(conn)
+    conn.commit()
+    conn.close()
+    print("Lead stats rebuilt successfully")
+
+# ===== Listing Helpers =====
+def encode_cursor(created_at, lead_id):
+    """Encode the (created_at, id) keyset position as an opaque cursor"""
+    raw = json.dumps([created_at, lead_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, raising ValueError if malformed"""
+    try:
+        created_at, lead_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(created_at, str) or not isinstance(lead_id, int):
+        raise ValueError('Invalid cursor')
+    return created_at, lead_id
+
+def parse_fields(args):
+    """Return the columns requested through ?fields=, defaulting to all columns"""
+    fields = args.get('fields')
+    if not fields:
+        return list(LEAD_COLUMNS)
+    
+    requested = [f.strip() for f in fields.split(',') if f.strip()]
+    unknown = [f for f in requested if f not in LEAD_COLUMNS]
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+    return requested
+
+def build_lead_filters(args):
+    """Build the WHERE clauses and parameters for the listing filters"""
+    clauses = []
+    params = []
+    
+    for column in LIST_FILTER_COLUMNS:
+        value = args.get(column)
+        if value:
+            clauses.append(f'{column} = ?')
+            params.append(value)
+    
+    created_after = args.get('created_after')
+    if created_after:
+        clauses.append('created_at >= ?')
+        params.append(created_after)
+    
+    created_before = args.get('created_before')
+    if created_before:
+        clauses.append('created_at < ?')
+        params.append(created_before)
+    
+    return clauses, params
+
+def build_search_query(text):
+    """Turn free text into an FTS5 query matching every term as a prefix"""
+    terms = re.findall(r'\w+', text)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+# ===== Lead Helpers =====
+def validate_lead(data):
+    """Return an error message if a required lead field is missing, else None"""
+    if not isinstance(data, dict):
+        return 'Lead must be an object'
+    for field in REQUIRED_FIELDS:
+        if field not in data or not data[field]:
+            return f'{field} is required'
+    return None
+
+def lead_values(data, timestamp):
+    """Build the INSERT_LEAD_SQL parameters for a validated lead"""
+    return (
+        data['first_name'],
+        data['last_name'],
+        data['email'],
+        data['phone'],
+        data.get('company', ''),
+        data.get('job_title', ''),
+        data.get('industry', ''),
+        data['lead_source'],
+        data.get('address', ''),
+        data.get('city', ''),
+        data.get('state', ''),
+        data.get('country', ''),
+        data.get('zipCode', ''),
+        data.get('notes', ''),
+        data['status'],
+        timestamp,
+        timestamp
+    ) + dedup_keys(data)
+
+def email_key(email):
+    """Normalize an email for duplicate detection"""
+    return str(email or '').strip().lower()
+
+def phone_key(phone):
+    """Normalize a phone number for duplicate detection"""
+    return re.sub(r'\D', '', str(phone or ''))[-PHONE_KEY_DIGITS:]
+
+def name_key(first_name, last_name):
+    """Normalize a full name for duplicate detection"""
+    return ' '.join(f"{first_name or ''} {last_name or ''}".lower().split())
+
+def dedup_keys(lead):
+    """Return the normalized (email, phone, name) duplicate-detection keys for a lead"""
+    return (
+        email_key(lead['email']),
+        phone_key(lead['phone']),
+        name_key(lead['first_name'], lead['last_name'])
+    )
+
+def build_lead_patch(data):
+    """Build the SET assignments and parameters for a partial lead update.
+    
+    Accepts column names or the camelCase names used by PUT. Normalized
+    duplicate keys are recomputed in the same statement through the SQL
+    functions registered in connect_db, using stored values for any
+    columns the patch leaves unchanged.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Request body must be an object')
+    
+    changes = {}
+    for field, value in data.items():
+        column = LEAD_FIELD_ALIASES.get(field, field)
+        if column not in PATCH_COLUMNS:
+            raise ValueError(f'Unknown field: {field}')
+        if value is not None and not isinstance(value, (str, int, float)):
+            raise ValueError(f'{field} must be a string or number')
+        if column in REQUIRED_FIELDS and not value:
+            raise ValueError(f'{column} is required')
+        changes[column] = value
+    if not changes:
+        raise ValueError('No fields to update')
+    
+    assignments = [f'{column} = ?' for column in changes]
+    params = list(changes.values())
+    
+    if 'email' in changes:
+        assignments.append('email_key = email_key(?)')
+        params.append(changes['email'])
+    if 'phone' in changes:
+        assignments.append('phone_key = phone_key(?)')
+        params.append(changes['phone'])
+    if 'first_name' in changes or 'last_name' in changes:
+        first_name = '?' if 'first_name' in changes else 'first_name'
+        last_name = '?' if 'last_name' in changes else 'last_name'
+        assignments.append(f'name_key = name_key({first_name}, {last_name})')
+        params.extend(changes[c] for c in ('first_name', 'last_name') if c in changes)
+    
+    assignments.append('updated_at = ?')
+    params.append(datetime.now().isoformat())
+    return assignments, params
+
+def find_duplicate_groups(conn, keys):
+    """Group leads sharing any of the given normalized keys.
+    
+    Each key column is indexed, so candidate pairs come from one GROUP BY
+    scan per key rather than comparing leads pairwise; groups that share
+    leads across keys are merged with a union-find.
+    """
+    parent = {}
+    matched_on = {}
+    
+    def find(lead_id):
+        while parent[lead_id] != lead_id:
+            parent[lead_id] = parent[parent[lead_id]]
+            lead_id = parent[lead_id]
+        return lead_id
+    
+    for key in keys:
+        column = DEDUP_KEY_COLUMNS[key]
+        blocks = conn.execute(f'''
+            SELECT group_concat(id) AS ids FROM leads
+            WHERE {column} != ''
+            GROUP BY {column} HAVING COUNT(*) > 1
+        ''')
+        for block in blocks:
+            ids = [int(i) for i in block['ids'].split(',')]
+            for lead_id in ids:
+                parent.setdefault(lead_id, lead_id)
+            root = find(ids[0])
+            for lead_id in ids[1:]:
+                other = find(lead_id)
+                if other != root:
+                    parent[other] = root
+                    matched_on.setdefault(root, set()).update(matched_on.pop(other, ()))
+            matched_on.setdefault(root, set()).add(key)
+    
+    groups = {}
+    for lead_id in parent:
+        groups.setdefault(find(lead_id), []).append(lead_id)
+    return [
+        {'ids': sorted(ids), 'matched_on': sorted(matched_on[root])}
+        for root, ids in sorted(groups.items(), key=lambda item: min(item[1]))
+    ]
+
+def read_bulk_records(req):
+    """Return an iterator of (row number, lead, decode error) from a bulk request body.
+    
+    A record that cannot be decoded carries an error message instead of a
+    lead so it can be reported without aborting the import.
+    """
+    content_type = req.mimetype
+    
+    if content_type == 'application/json':
+        data = req.get_json(silent=True)
+        if not isinstance(data, list):
+            raise ValueError('Request body must be a JSON array of leads')
+        return ((row_num, lead, None) for row_num, lead in enumerate(data, 1))
+    
+    stream = io.TextIOWrapper(req.stream, encoding='utf-8', newline='')
+    
+    if content_type in ('application/x-ndjson', 'application/jsonl'):
+        return read_ndjson_records(stream)
+    
+    if content_type == 'text/csv':
+        reader = csv.DictReader(stream)
+        return ((row_num, lead, None) for row_num, lead in enumerate(reader, 1))
+    
+    raise ValueError('Content-Type must be application/json, application/x-ndjson or text/csv')
+
+def read_ndjson_records(stream):
+    """Yield (row number, lead, decode error) from newline-delimited JSON"""
+    row_num = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        row_num += 1
+        try:
+            lead = json.loads(line)
+        except ValueError:
+            yield row_num, None, 'Invalid JSON'
+            continue
+        yield row_num, lead, None
+
+def insert_lead_batch(conn, batch, errors):
+    """Insert a batch of (row number, values) pairs, returning the number inserted.
+    
+    The batch goes through a single executemany; if any row is rejected the
+    batch is rolled back to its savepoint and retried row by row so only the
+    offending rows are reported in errors.
+    """
+    conn.execute('SAVEPOINT lead_batch')
+    try:
+        conn.executemany(INSERT_LEAD_SQL, [values for _, values in batch])
+        conn.execute('RELEASE lead_batch')
+        return len(batch)
+    except sqlite3.Error:
+        conn.execute('ROLLBACK TO lead_batch')
+    
+    inserted = 0
+    for row_num, values in batch:
+        try:
+            conn.execute(INSERT_LEAD_SQL, values)
+            inserted += 1
+        except sqlite3.Error as e:
+            errors.append({'row': row_num, 'error': str(e)})
+    conn.execute('RELEASE lead_batch')
+    return inserted
+
+def stream_file(path, chunk_size=64 * 1024):
+    """Yield a file in chunks"""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+def iter_export_rows(query, params, fields, export_format):
+    """Yield encoded CSV or NDJSON chunks for a query, EXPORT_CHUNK_SIZE rows at a time.
+    
+    Uses a dedicated connection rather than the request's pooled one, since
+    the generator keeps running after the request handler has returned.
+    """
+    conn = connect_db()
+    try:
+        cursor = conn.execute(query, params)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == 'csv':
+            writer.writerow(fields)
+        
+        while True:
+            rows = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+            if not rows:
+                break
+            if export_format == 'csv':
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    buffer.write(json.dumps(dict(zip(fields, row))))
+                    buffer.write('\n')
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        
+        if export_format == 'csv' and buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+    finally:
+        conn.close()
+
+def gzip_chunks(chunks):
+    """Gzip-compress a stream of byte chunks incrementally"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def export_leads_stream(export_format):
+    """Stream leads matching the listing filters as CSV or NDJSON"""
+    try:
+        fields = parse_fields(request.args)
+        clauses, params = build_lead_filters(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    query = f'SELECT {", ".join(fields)} FROM leads'
+    if clauses:
+        query += ' WHERE ' + ' AND '.join(clauses)
+    query += ' ORDER BY created_at DESC, id DESC'
+    
+    body = iter_export_rows(query, params, fields, export_format)
+    filename = f'leads_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{export_format}'
+    headers = {'Content-Disposition': f'attachment; filename={filename}', 'Vary': 'Accept-Encoding'}
+    if 'gzip' in request.accept_encodings:
+        body = gzip_chunks(body)
+        headers['Content-Encoding'] = 'gzip'
+    
+    return Response(body, mimetype=STREAM_EXPORT_MIMETYPES[export_format], headers=headers)
+
+# ===== Archiving =====
+def archive_leads(statuses=ARCHIVE_STATUSES, days=ARCHIVE_AFTER_DAYS,
+                  batch_size=ARCHIVE_BATCH_SIZE, vacuum=True):
+    """Move leads with one of statuses, untouched for days, into the archive database.
+    
+    Each batch is copied into the archive in one transaction and deleted
+    from the hot database in the next. A job interrupted between the two
+    leaves leads in both databases, never in neither, and the copy skips
+    leads already archived, so it can simply be run again. Archived leads
+    stay counted in lead_stats.
+    """
+    cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+    archived_at = datetime.now().isoformat()
+    columns = ', '.join(ARCHIVE_COLUMNS)
+    status_placeholders = ', '.join('?' for _ in statuses)
+    archived = 0
+    batches = 0
+    
+    conn = connect_db()
+    try:
+        while statuses:
+            ids = [row['id'] for row in conn.execute(f'''
+                SELECT id FROM main.leads
+                WHERE status IN ({status_placeholders}) AND updated_at < ?
+                LIMIT ?
+            ''', (*statuses, cutoff, batch_size))]
+            if not ids:
+                break
+            
+            # SQLite only commits one database atomically in WAL mode, so the
+            # copy is committed before the delete from the hot database
+            id_placeholders = ', '.join('?' for _ in ids)
+            conn.execute(f'''
+                INSERT OR IGNORE INTO archive.leads ({columns}, archived_at)
+                SELECT {columns}, ? FROM main.leads WHERE id IN ({id_placeholders})
+            ''', (archived_at, *ids))
+            conn.commit()
+            
+            conn.execute(f'DELETE FROM main.leads WHERE id IN ({id_placeholders})', ids)
+            
+            # The delete trigger took these leads out of the rollup; add them back
+            conn.execute(f'''
+                INSERT INTO lead_stats (day, status, lead_source, industry, count)
+                SELECT {STATS_KEY_SQL.format(row='a')}, COUNT(*)
+                FROM archive.leads AS a WHERE a.id IN ({id_placeholders})
+                GROUP BY 1, 2, 3, 4
+                ON CONFLICT (day, status, lead_source, industry)
+                DO UPDATE SET count = count + excluded.count
+            ''', ids)
+            bump_data_version(conn)
+            conn.commit()
+            
+            archived += len(ids)
+            batches += 1
+        
+        if archived and vacuum:
+            conn.execute('VACUUM main')
+        
+        return {
+            'archived': archived,
+            'batches': batches,
+            'vacuumed': bool(archived and vacuum),
+            'hot_leads': conn.execute('SELECT COUNT(*) FROM main.leads').fetchone()[0],
+            'archived_leads': conn.execute('SELECT COUNT(*) FROM archive.leads').fetchone()[0]
+        }
+    finally:
+        conn.close()
+
+def restore_archived_lead(conn, lead_id):
+    """Move an archived lead back into the hot table, returning False if it is not archived.
+    
+    Like archive_leads, the copy is committed before the archived row is
+    deleted, so a crash in between leaves the lead in both databases rather
+    than in neither. Call before the request's own changes. Archived leads
+    stay counted in lead_stats, so the count added by the insert trigger is
+    taken back out.
+    """
+    columns = ', '.join(ARCHIVE_COLUMNS)
+    cursor = conn.execute(f'''
+        INSERT INTO main.leads ({columns})
+        SELECT {columns} FROM archive.leads WHERE id = ?
+    ''', (lead_id,))
+    if not cursor.rowcount:
+        return False
+    conn.execute(f'''
+        UPDATE lead_stats SET count = count - 1
+        WHERE (day, status, lead_source, industry) = (
+            SELECT {STATS_KEY_SQL.format(row='l')} FROM main.leads AS l WHERE l.id = ?
+        )
+    ''', (lead_id,))
+    conn.commit()
+    
+    conn.execute('DELETE FROM archive.leads WHERE id = ?', (lead_id,))
+    conn.commit()
+    return True
+
+@app.cli.command('archive-leads')
+@click.option('--status', 'statuses', multiple=True, default=ARCHIVE_STATUSES,
+              help='Status to archive; repeat for several.')
+@click.option('--days', type=int, default=ARCHIVE_AFTER_DAYS,
+              help='Archive leads not updated for this many days.')
+@click.option('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+@click.option('--no-vacuum', is_flag=True, help='Skip VACUUM of the hot database.')
+def archive_leads_command(statuses, days, batch_size, no_vacuum):
+    """Move old leads into the archive database"""
+    init_db()
+    report = archive_leads(list(statuses), days, batch_size, not no_vacuum)
+    print(json.dumps(report))
+
+# ===== Response Cache =====
+class ResponseCache:
+    """Size-bounded LRU cache of serialized responses for one data version"""
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+        self._version = None
+    
+    def get(self, key, version):
+        """Return the cached (body, headers) for key at version, or None"""
+        with self._lock:
+            if version != self._version:
+                self._clear(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+    
+    def put(self, key, version, body, headers):
+        """Store a response body, evicting least recently used entries to fit"""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old[0])
+            self._entries[key] = (body, headers)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+    
+    def _clear(self, version):
+        self._entries.clear()
+        self._size = 0
+        self._version = version
+    
+    def stats(self):
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'version': self._version
+            }
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_BYTES)
+
+def get_data_version(conn):
+    """Return the current (version, modified_at datetime) of the lead data"""
+    row = conn.execute('SELECT version, modified_at FROM data_version WHERE id = 1').fetchone()
+    return row['version'], datetime.fromisoformat(row['modified_at'])
+
+def bump_data_version(conn):
+    """Record a write; call inside the writing transaction before commit"""
+    conn.execute(
+        'UPDATE data_version SET version = version + 1, modified_at = ? WHERE id = 1',
+        (datetime.now(timezone.utc).isoformat(),)
+    )
+
+def cached_read(view):
+    """Serve a read endpoint with ETag/Last-Modified validation and the response cache"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            version, modified_at = get_data_version(get_db_connection())
+            etag = f'v{version}'
+            modified_at = modified_at.replace(microsecond=0)
+            
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = since is not None and modified_at <= since
+            if not_modified:
+                response = Response(status=304)
+            else:
+                key = (request.path, tuple(sorted(request.args.items(multi=True))))
+                entry = response_cache.get(key, version)
+                if entry is not None:
+                    body, headers = entry
+                    response = Response(body, mimetype='application/json', headers=headers)
+                else:
+                    response = app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    headers = {h: response.headers[h] for h in CACHED_HEADERS if h in response.headers}
+                    response_cache.put(key, version, response.get_data(), headers)
+            
+            response.set_etag(etag)
+            response.last_modified = modified_at
+            return response
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+    return wrapper
+
 # ===== API Routes =====
 
 @app.route('/api/health', methods=['GET'])
@@ -56,18 +1203,65 @@ def health_check():
     """Health check endpoint"""
     return jsonify({'status': 'healthy', 'message': 'API is running'}), 200
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Request, SQL and cache metrics in Prometheus text format"""
+    cache = response_cache.stats()
+    body = metrics.render(extra=(
+        ('lead_api_response_cache_hits_total', 'counter', 'Response cache hits.', cache['hits']),
+        ('lead_api_response_cache_misses_total', 'counter', 'Response cache misses.', cache['misses']),
+        ('lead_api_response_cache_evictions_total', 'counter', 'Response cache evictions.', cache['evictions']),
+        ('lead_api_response_cache_bytes', 'gauge', 'Bytes held in the response cache.', cache['bytes']),
+    ))
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/cache', methods=['GET'])
+def get_cache_stats():
+    """Response cache hit rate and occupancy"""
+    return jsonify(response_cache.stats()), 200
+
 @app.route('/api/leads', methods=['GET'])
+@cached_read
 def get_leads():
-    """Get all leads"""
+    """Get a page of leads, newest first, with optional filters, projection and keyset pagination"""
     try:
+        try:
+            fields = parse_fields(request.args)
+            clauses, params = build_lead_filters(request.args)
+            
+            limit = request.args.get('limit', LEADS_PAGE_SIZE, type=int)
+            if not 1 <= limit <= MAX_PAGE_SIZE:
+                raise ValueError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+            
+            cursor = request.args.get('cursor')
+            if cursor:
+                clauses.append('(created_at, id) < (?, ?)')
+                params.extend(decode_cursor(cursor))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # id and created_at are always selected so the next cursor can be built
+        columns = list(dict.fromkeys(fields + ['id', 'created_at']))
+        query = f'SELECT {", ".join(columns)} FROM leads'
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        # Fetch one extra row to know whether another page exists
+        query += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+        params.append(limit + 1)
+        
         conn = get_db_connection()
-        leads = conn.execute('''
-            SELECT * FROM leads ORDER BY created_at DESC
-        ''').fetchall()
-        conn.close()
+        leads = conn.execute(query, params).fetchall()
         
-        leads_list = [dict(lead) for lead in leads]
-        return jsonify(leads_list), 200
+        next_cursor = None
+        if len(leads) > limit:
+            leads = leads[:limit]
+            next_cursor = encode_cursor(leads[-1]['created_at'], leads[-1]['id'])
+        
+        leads_list = [{field: lead[field] for field in fields} for lead in leads]
+        response = jsonify(leads_list)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -78,52 +1272,227 @@ def create_lead():
         data = request.get_json()
         
         # Validate required fields
-        required_fields = ['first_name', 'last_name', 'email', 'phone', 'lead_source', 'status']
-        for field in required_fields:
-            if field not in data or not data[field]:
-                return jsonify({'error': f'{field} is required'}), 400
+        error = validate_lead(data)
+        if error:
+            return jsonify({'error': error}), 400
         
+        values = lead_values(data, datetime.now().isoformat())
         conn = get_db_connection()
-        conn.execute('''
-            INSERT INTO leads (
-                first_name, last_name, email, phone, company, job_title,
-                industry, lead_source, address, city, state, country,
-                zip_code, notes, status, created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['first_name'],
-            data['last_name'],
-            data['email'],
-            data['phone'],
-            data.get('company', ''),
-            data.get('job_title', ''),
-            data.get('industry', ''),
-            data['lead_source'],
-            data.get('address', ''),
-            data.get('city', ''),
-            data.get('state', ''),
-            data.get('country', ''),
-            data.get('zipCode', ''),
-            data.get('notes', ''),
-            data['status'],
-            datetime.now().isoformat(),
-            datetime.now().isoformat()
-        ))
+        
+        # Optionally merge into an existing lead with the same email or phone
+        if request.args.get('on_duplicate') == 'update':
+            email_norm, phone_norm, _ = values[-3:]
+            duplicate = conn.execute('''
+                SELECT id FROM leads
+                WHERE (email_key = ? AND email_key != '') OR (phone_key = ? AND phone_key != '')
+                ORDER BY id LIMIT 1
+            ''', (email_norm, phone_norm)).fetchone()
+            if duplicate:
+                # Every inserted column except created_at
+                conn.execute(UPDATE_LEAD_SQL, values[:15] + values[16:] + (duplicate['id'],))
+                bump_data_version(conn)
+                conn.commit()
+                return jsonify({'id': duplicate['id'], 'message': 'Lead updated successfully'}), 200
+        
+        cursor = conn.execute(INSERT_LEAD_SQL, values)
+        bump_data_version(conn)
         conn.commit()
-        lead_id = conn.lastrowid
-        conn.close()
+        lead_id = cursor.lastrowid
         
         return jsonify({'id': lead_id, 'message': 'Lead created successfully'}), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/leads/bulk', methods=['POST'])
+def create_leads_bulk():
+    """Create many leads from a JSON array, NDJSON or CSV body in one transaction"""
+    try:
+        batch_size = request.args.get('batch_size', BULK_BATCH_SIZE, type=int)
+        if not 1 <= batch_size <= MAX_BULK_BATCH_SIZE:
+            return jsonify({'error': f'batch_size must be between 1 and {MAX_BULK_BATCH_SIZE}'}), 400
+        
+        try:
+            records = read_bulk_records(request)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        timestamp = datetime.now().isoformat()
+        inserted = 0
+        errors = []
+        batch = []
+        
+        conn = get_db_connection()
+        for row_num, data, error in records:
+            error = error or validate_lead(data)
+            if error:
+                errors.append({'row': row_num, 'error': error})
+                continue
+            
+            batch.append((row_num, lead_values(data, timestamp)))
+            if len(batch) >= batch_size:
+                inserted += insert_lead_batch(conn, batch, errors)
+                batch = []
+        
+        if batch:
+            inserted += insert_lead_batch(conn, batch, errors)
+        if inserted:
+            bump_data_version(conn)
+        conn.commit()
+        
+        return jsonify({
+            'inserted': inserted,
+            'failed': len(errors),
+            'errors': errors[:MAX_BULK_ERRORS]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/leads/search', methods=['GET'])
+@cached_read
+def search_leads():
+    """Full-text search over leads, best matches first"""
+    try:
+        match = build_search_query(request.args.get('q', ''))
+        if not match:
+            return jsonify({'error': 'q is required'}), 400
+        
+        try:
+            fields = parse_fields(request.args)
+            limit = request.args.get('limit', SEARCH_PAGE_SIZE, type=int)
+            offset = request.args.get('offset', 0, type=int)
+            if not 1 <= limit <= MAX_PAGE_SIZE:
+                raise ValueError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+            if offset < 0:
+                raise ValueError('offset must not be negative')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        conn = get_db_connection()
+        columns = ", ".join(f"l.{field}" for field in fields)
+        # Archived leads are searched alongside hot ones and ranked together
+        leads = conn.execute(f'''
+            SELECT {", ".join(fields)} FROM (
+                SELECT {columns}, f.rank AS rank
+                FROM main.leads_fts AS f JOIN main.leads AS l ON l.id = f.rowid
+                WHERE f.leads_fts MATCH ?
+                UNION ALL
+                SELECT {columns}, f.rank AS rank
+                FROM archive.leads_fts AS f JOIN archive.leads AS l ON l.id = f.rowid
+                WHERE f.leads_fts MATCH ?
+            )
+            ORDER BY rank
+            LIMIT ? OFFSET ?
+        ''', (match, match, limit, offset)).fetchall()
+        
+        return jsonify([dict(lead) for lead in leads]), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/leads/stats', methods=['GET'])
+@cached_read
+def get_lead_stats():
+    """Lead counts from the analytics rollup, grouped and bucketed by day, week, month or year"""
+    try:
+        group_by = [c.strip() for c in request.args.get('group_by', '').split(',') if c.strip()]
+        unknown = [c for c in group_by if c not in STATS_GROUP_COLUMNS]
+        if unknown:
+            return jsonify({'error': f'Unknown group_by columns: {", ".join(unknown)}'}), 400
+        
+        bucket = request.args.get('bucket')
+        if bucket and bucket not in STATS_BUCKETS:
+            return jsonify({'error': f'bucket must be one of: {", ".join(STATS_BUCKETS)}'}), 400
+        
+        clauses = []
+        params = []
+        for column in STATS_GROUP_COLUMNS:
+            value = request.args.get(column)
+            if value:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        
+        # The rollup is keyed by day, so date bounds apply to whole days
+        created_after = request.args.get('created_after')
+        if created_after:
+            clauses.append('day >= ?')
+            params.append(created_after[:10])
+        created_before = request.args.get('created_before')
+        if created_before:
+            clauses.append('day < ?')
+            params.append(created_before[:10])
+        
+        columns = list(group_by)
+        if bucket:
+            columns.insert(0, f'{STATS_BUCKETS[bucket]} AS bucket')
+        
+        query = f'SELECT {", ".join(columns + ["COALESCE(SUM(count), 0) AS count"])} FROM lead_stats'
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        if columns:
+            keys = ', '.join(str(i) for i in range(1, len(columns) + 1))
+            query += f' GROUP BY {keys} ORDER BY {keys}'
+        
+        conn = get_db_connection()
+        rows = conn.execute(query, params).fetchall()
+        
+        return jsonify([dict(row) for row in rows]), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/leads/duplicates', methods=['GET'])
+def get_duplicate_leads():
+    """Report groups of leads that share a normalized email, phone or name"""
+    try:
+        keys = [k.strip() for k in request.args.get('by', 'email,phone').split(',') if k.strip()]
+        unknown = [k for k in keys if k not in DEDUP_KEY_COLUMNS]
+        if unknown or not keys:
+            return jsonify({'error': f'by must list any of: {", ".join(DEDUP_KEY_COLUMNS)}'}), 400
+        
+        limit = request.args.get('limit', DUPLICATES_PAGE_SIZE, type=int)
+        offset = request.args.get('offset', 0, type=int)
+        if not 1 <= limit <= MAX_PAGE_SIZE or offset < 0:
+            return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+        
+        conn = get_db_connection()
+        groups = find_duplicate_groups(conn, keys)
+        
+        return jsonify({
+            'total_groups': len(groups),
+            'duplicate_leads': sum(len(group['ids']) for group in groups),
+            'groups': groups[offset:offset + limit]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/leads/archive', methods=['POST'])
+def run_archive():
+    """Run the archiving job and report what it moved"""
+    try:
+        data = request.get_json(silent=True) or {}
+        statuses = data.get('statuses', list(ARCHIVE_STATUSES))
+        days = data.get('days', ARCHIVE_AFTER_DAYS)
+        if not isinstance(statuses, list) or not all(isinstance(st, str) for st in statuses):
+            return jsonify({'error': 'statuses must be a list of status names'}), 400
+        if not isinstance(days, int) or days < 0:
+            return jsonify({'error': 'days must be a non-negative integer'}), 400
+        
+        report = archive_leads(statuses, days, vacuum=bool(data.get('vacuum', True)))
+        return jsonify(report), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/leads/<int:lead_id>', methods=['GET'])
+@cached_read
 def get_lead(lead_id):
     """Get a specific lead by ID"""
     try:
         conn = get_db_connection()
-        lead = conn.execute('SELECT * FROM leads WHERE id = ?', (lead_id,)).fetchone()
-        conn.close()
+        lead = conn.execute(
+            f'SELECT {", ".join(LEAD_COLUMNS)} FROM main.leads WHERE id = ?', (lead_id,)
+        ).fetchone()
+        if not lead:
+            lead = conn.execute(
+                f'SELECT {", ".join(LEAD_COLUMNS)} FROM archive.leads WHERE id = ?', (lead_id,)
+            ).fetchone()
         
         if lead:
             return jsonify(dict(lead)), 200
@@ -140,25 +1509,27 @@ def update_lead(lead_id):
         
         conn = get_db_connection()
         
-        # Check if lead exists
+        # Check if lead exists, bringing an archived lead back to be edited
         lead = conn.execute('SELECT * FROM leads WHERE id = ?', (lead_id,)).fetchone()
+        if not lead and restore_archived_lead(conn, lead_id):
+            lead = conn.execute('SELECT * FROM leads WHERE id = ?', (lead_id,)).fetchone()
         if not lead:
-            conn.close()
             return jsonify({'error': 'Lead not found'}), 404
         
+        first_name = data.get('firstName', lead['first_name'])
+        last_name = data.get('lastName', lead['last_name'])
+        email = data.get('email', lead['email'])
+        phone = data.get('phone', lead['phone'])
+        keys = dedup_keys({
+            'first_name': first_name, 'last_name': last_name, 'email': email, 'phone': phone
+        })
+        
         # Update lead
-        conn.execute('''
-            UPDATE leads SET
-                first_name = ?, last_name = ?, email = ?, phone = ?,
-                company = ?, job_title = ?, industry = ?, lead_source = ?,
-                address = ?, city = ?, state = ?, country = ?,
-                zip_code = ?, notes = ?, status = ?, updated_at = ?
-            WHERE id = ?
-        ''', (
-            data.get('firstName', lead['first_name']),
-            data.get('lastName', lead['last_name']),
-            data.get('email', lead['email']),
-            data.get('phone', lead['phone']),
+        conn.execute(UPDATE_LEAD_SQL, (
+            first_name,
+            last_name,
+            email,
+            phone,
             data.get('company', lead['company']),
             data.get('jobTitle', lead['job_title']),
             data.get('industry', lead['industry']),
@@ -170,107 +1541,157 @@ def update_lead(lead_id):
             data.get('zipCode', lead['zip_code']),
             data.get('notes', lead['notes']),
             data.get('status', lead['status']),
-            datetime.now().isoformat(),
-            lead_id
-        ))
+            datetime.now().isoformat()
+        ) + keys + (lead_id,))
+        bump_data_version(conn)
         conn.commit()
-        conn.close()
         
         return jsonify({'message': 'Lead updated successfully'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/leads/<int:lead_id>', methods=['DELETE'])
-def delete_lead(lead_id):
-    """Delete a lead"""
+@app.route('/api/leads/<int:lead_id>', methods=['PATCH'])
+def patch_lead(lead_id):
+    """Update only the supplied fields of a lead"""
     try:
+        try:
+            assignments, params = build_lead_patch(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         conn = get_db_connection()
+        query = f'UPDATE leads SET {", ".join(assignments)} WHERE id = ?'
+        cursor = conn.execute(query, params + [lead_id])
+        if cursor.rowcount == 0 and restore_archived_lead(conn, lead_id):
+            cursor = conn.execute(query, params + [lead_id])
+        if cursor.rowcount:
+            bump_data_version(conn)
+        conn.commit()
         
-        # Check if lead exists
-        lead = conn.execute('SELECT * FROM leads WHERE id = ?', (lead_id,)).fetchone()
-        if not lead:
-            conn.close()
+        if cursor.rowcount == 0:
             return jsonify({'error': 'Lead not found'}), 404
+        return jsonify({'message': 'Lead updated successfully'}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/leads', methods=['PATCH'])
+def patch_leads():
+    """Apply the same partial update to many leads in one transaction"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be an object'}), 400
+        
+        data = dict(data)
+        ids = data.pop('ids', None)
+        if (not isinstance(ids, list) or not ids
+                or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)):
+            return jsonify({'error': 'ids must be a non-empty list of lead IDs'}), 400
+        if len(ids) > MAX_PATCH_IDS:
+            return jsonify({'error': f'At most {MAX_PATCH_IDS} ids can be updated at once'}), 400
         
-        conn.execute('DELETE FROM leads WHERE id = ?', (lead_id,))
+        try:
+            assignments, params = build_lead_patch(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        conn = get_db_connection()
+        cursor = conn.executemany(
+            f'UPDATE leads SET {", ".join(assignments)} WHERE id = ?',
+            (params + [lead_id] for lead_id in ids)
+        )
+        if cursor.rowcount:
+            bump_data_version(conn)
         conn.commit()
-        conn.close()
         
+        return jsonify({'requested': len(ids), 'updated': cursor.rowcount}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/leads/<int:lead_id>', methods=['DELETE'])
+def delete_lead(lead_id):
+    """Delete a lead"""
+    try:
+        conn = get_db_connection()
+        cursor = conn.execute('DELETE FROM leads WHERE id = ?', (lead_id,))
+        if cursor.rowcount == 0 and restore_archived_lead(conn, lead_id):
+            cursor = conn.execute('DELETE FROM leads WHERE id = ?', (lead_id,))
+        if cursor.rowcount:
+            bump_data_version(conn)
+        conn.commit()
+        
+        if cursor.rowcount == 0:
+            return jsonify({'error': 'Lead not found'}), 404
         return jsonify({'message': 'Lead deleted successfully'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/leads/export', methods=['GET'])
 def export_leads():
-    """Export all leads to Excel"""
+    """Export all leads to Excel, or stream them as CSV or NDJSON"""
+    export_format = request.args.get('format', 'xlsx')
+    if export_format in STREAM_EXPORT_MIMETYPES:
+        return export_leads_stream(export_format)
+    if export_format != 'xlsx':
+        return jsonify({'error': 'format must be one of: xlsx, csv, ndjson'}), 400
+    
+    filename = f'leads_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+    fd, path = tempfile.mkstemp(suffix='.xlsx', prefix='leads_export_')
+    os.close(fd)
     try:
         conn = get_db_connection()
-        leads = conn.execute('SELECT * FROM leads ORDER BY created_at DESC').fetchall()
-        conn.close()
         
-        # Create Excel workbook
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Leads"
+        # Column widths must be known before the first row is written in
+        # write-only mode, so measure every column in one aggregate scan
+        widths = conn.execute('SELECT ' + ', '.join(
+            f'MAX(LENGTH({column}))' for column in LEAD_COLUMNS
+        ) + ' FROM leads').fetchone()
         
-        # Define headers
-        headers = [
-            'ID', 'First Name', 'Last Name', 'Email', 'Phone', 'Company',
-            'Job Title', 'Industry', 'Lead Source', 'Address', 'City',
-            'State', 'Country', 'Zip Code', 'Notes', 'Status', 'Created At', 'Updated At'
-        ]
+        # Create write-only Excel workbook
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Leads")
+        
+        for col_num, header in enumerate(EXPORT_HEADERS, 1):
+            max_length = max(len(header), widths[col_num - 1] or 0)
+            ws.column_dimensions[get_column_letter(col_num)].width = min(max_length + 2, 50)
         
         # Style header row
         header_fill = PatternFill(start_color="6366f1", end_color="6366f1", fill_type="solid")
         header_font = Font(bold=True, color="FFFFFF")
+        header_alignment = Alignment(horizontal='center', vertical='center')
         
-        # Write headers
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num)
-            cell.value = header
+        header_row = []
+        for header in EXPORT_HEADERS:
+            cell = WriteOnlyCell(ws, value=header)
             cell.fill = header_fill
             cell.font = header_font
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-        
-        # Write data
-        for row_num, lead in enumerate(leads, 2):
-            ws.cell(row=row_num, column=1, value=lead['id'])
-            ws.cell(row=row_num, column=2, value=lead['first_name'])
-            ws.cell(row=row_num, column=3, value=lead['last_name'])
-            ws.cell(row=row_num, column=4, value=lead['email'])
-            ws.cell(row=row_num, column=5, value=lead['phone'])
-            ws.cell(row=row_num, column=6, value=lead['company'] or '')
-            ws.cell(row=row_num, column=7, value=lead['job_title'] or '')
-            ws.cell(row=row_num, column=8, value=lead['industry'] or '')
-            ws.cell(row=row_num, column=9, value=lead['lead_source'])
-            ws.cell(row=row_num, column=10, value=lead['address'] or '')
-            ws.cell(row=row_num, column=11, value=lead['city'] or '')
-            ws.cell(row=row_num, column=12, value=lead['state'] or '')
-            ws.cell(row=row_num, column=13, value=lead['country'] or '')
-            ws.cell(row=row_num, column=14, value=lead['zip_code'] or '')
-            ws.cell(row=row_num, column=15, value=lead['notes'] or '')
-            ws.cell(row=row_num, column=16, value=lead['status'])
-            ws.cell(row=row_num, column=17, value=lead['created_at'])
-            ws.cell(row=row_num, column=18, value=lead['updated_at'])
-        
-        # Auto-adjust column widths
-        for col_num, header in enumerate(headers, 1):
-            column_letter = get_column_letter(col_num)
-            max_length = max(
-                len(str(header)),
-                max((len(str(ws.cell(row=row_num, column=col_num).value)) 
-                     for row_num in range(2, len(leads) + 2) if ws.cell(row=row_num, column=col_num).value), 
-                    default=0)
-            )
-            ws.column_dimensions[column_letter].width = min(max_length + 2, 50)
+            cell.alignment = header_alignment
+            header_row.append(cell)
+        ws.append(header_row)
         
-        # Save to temporary file
-        filename = f'leads_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-        wb.save(filename)
+        # Stream data rows from the cursor in chunks
+        cursor = conn.execute(
+            f'SELECT {", ".join(LEAD_COLUMNS)} FROM leads ORDER BY created_at DESC, id DESC'
+        )
+        while True:
+            leads = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+            if not leads:
+                break
+            for lead in leads:
+                ws.append(['' if value is None else value for value in lead])
         
-        return send_file(filename, as_attachment=True, download_name=filename)
+        wb.save(path)
     except Exception as e:
+        os.remove(path)
         return jsonify({'error': str(e)}), 500
+    
+    response = Response(stream_file(path), mimetype=XLSX_MIMETYPE)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['Content-Length'] = str(os.path.getsize(path))
+    # Delete the file when the server closes the response, which also
+    # happens for HEAD requests and clients that disconnect mid-download
+    response.call_on_close(lambda: os.remove(path))
+    return response
 
 # ===== Main =====
 if __name__ == '__main__':
@@ -0,0 +1,9 @@
+"""
+Benchmarks for the Lead Generation System API.
+
+    python -m benchmarks.generate --sizes 10000 100000 1000000
+    python -m benchmarks.run --sizes 10000 --output results.json
+    python -m benchmarks.compare before.json after.json
+
+Run from the lead-generation-system directory.
+"""
@@ -0,0 +1,43 @@
+"""
+Compare two benchmark reports produced by benchmarks.run.
+
+Prints the change in p50/p99 latency and requests/sec for every
+(size, transport, scenario) present in both reports.
+"""
+
+import argparse
+import json
+
+METRICS = ('p50_ms', 'p99_ms', 'requests_per_sec')
+
+def load_results(path):
+    with open(path) as f:
+        report = json.load(f)
+    return {(r['size'], r['transport'], r['scenario']): r for r in report['results']}
+
+def change(before, after):
+    if not before or after is None:
+        return 'n/a'
+    return f'{(after - before) / before * 100:+.1f}%'
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare two benchmark reports')
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args(argv)
+    
+    before = load_results(args.before)
+    after = load_results(args.after)
+    
+    print(f'{"size":>8} {"transport":<12} {"scenario":<15} ' +
+          ' '.join(f'{metric:>24}' for metric in METRICS))
+    for key in sorted(before.keys() & after.keys()):
+        size, transport, scenario = key
+        cells = []
+        for metric in METRICS:
+            b, a = before[key][metric], after[key][metric]
+            cells.append(f'{b} -> {a} ({change(b, a)})'.rjust(24))
+        print(f'{size:>8} {transport:<12} {scenario:<15} ' + ' '.join(cells))
+
+if __name__ == '__main__':
+    main()
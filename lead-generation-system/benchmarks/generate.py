@@ -0,0 +1,146 @@
+"""
+Seeded synthetic lead generator.
+
+Builds lead databases of a given size for benchmarking. The same seed and
+size always produce the same rows, so runs on different commits are
+comparable.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+import app
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+DEFAULT_SIZES = (10000, 100000, 1000000)
+DEFAULT_SEED = 42
+INSERT_BATCH_SIZE = 10000
+
+FIRST_NAMES = [
+    'James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda',
+    'William', 'Elizabeth', 'David', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica',
+    'Thomas', 'Sarah', 'Charles', 'Karen', 'Priya', 'Wei', 'Carlos', 'Aisha'
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+    'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson',
+    'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin', 'Patel', 'Chen', 'Kim', 'Nguyen'
+]
+COMPANIES = [
+    'Acme Corp', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark Industries',
+    'Wayne Enterprises', 'Wonka Industries', 'Cyberdyne', 'Soylent', 'Tyrell', 'Vandelay'
+]
+JOB_TITLES = ['CEO', 'CTO', 'Manager', 'Director', 'Engineer', 'Analyst', 'Consultant', 'VP Sales']
+INDUSTRIES = ['Technology', 'Healthcare', 'Finance', 'Retail', 'Manufacturing', 'Education', 'Other']
+LEAD_SOURCES = ['Website', 'Referral', 'Social Media', 'Email Campaign', 'Trade Show', 'Cold Call', 'Other']
+STATUSES = ['New', 'Contacted', 'Qualified', 'Converted', 'Lost']
+CITIES = [
+    ('New York', 'NY'), ('Los Angeles', 'CA'), ('Chicago', 'IL'), ('Houston', 'TX'),
+    ('Phoenix', 'AZ'), ('Boston', 'MA'), ('Seattle', 'WA'), ('Denver', 'CO'), ('Miami', 'FL')
+]
+NOTES = [
+    'Interested in our services', 'Requested a demo', 'Follow up next quarter',
+    'Budget approved', 'Asked for pricing', ''
+]
+
+def generate_lead(rng, index, start, span_seconds):
+    """Return (lead dict, created_at) for the index-th synthetic lead"""
+    first_name = rng.choice(FIRST_NAMES)
+    last_name = rng.choice(LAST_NAMES)
+    city, state = rng.choice(CITIES)
+    created_at = start + timedelta(seconds=rng.randrange(span_seconds))
+    lead = {
+        'first_name': first_name,
+        'last_name': last_name,
+        'email': f'{first_name}.{last_name}{index}@example.com'.lower(),
+        'phone': f'+1 {rng.randrange(200, 999)}-{rng.randrange(200, 999)}-{rng.randrange(10000):04d}',
+        'company': rng.choice(COMPANIES),
+        'job_title': rng.choice(JOB_TITLES),
+        'industry': rng.choice(INDUSTRIES),
+        'lead_source': rng.choice(LEAD_SOURCES),
+        'address': f'{rng.randrange(1, 9999)} Main St',
+        'city': city,
+        'state': state,
+        'country': 'USA',
+        'zipCode': f'{rng.randrange(10000, 99999)}',
+        'notes': rng.choice(NOTES),
+        'status': rng.choice(STATUSES)
+    }
+    return lead, created_at.isoformat()
+
+def database_path(size, seed=DEFAULT_SEED):
+    """Path of the generated database for a size and seed"""
+    return os.path.join(DATA_DIR, f'leads_{size}_{seed}.db')
+
+def remove_database(path):
+    """Delete the database at path and its archive, WAL and shared-memory files"""
+    app.DATABASE = path
+    for base in (path, app.archive_database_path()):
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(base + suffix):
+                os.remove(base + suffix)
+
+def generate_database(size, seed=DEFAULT_SEED, force=False):
+    """Create (or reuse) a database with size synthetic leads and return its path"""
+    path = database_path(size, seed)
+    if os.path.exists(path) and not force:
+        return path
+    
+    os.makedirs(DATA_DIR, exist_ok=True)
+    remove_database(path)
+    app.init_db()
+    
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    span_seconds = 2 * 365 * 24 * 3600
+    
+    conn = app.connect_db()
+    batch = []
+    for index in range(size):
+        lead, created_at = generate_lead(rng, index, start, span_seconds)
+        batch.append(app.lead_values(lead, created_at))
+        if len(batch) >= INSERT_BATCH_SIZE:
+            conn.executemany(app.INSERT_LEAD_SQL, batch)
+            batch = []
+    if batch:
+        conn.executemany(app.INSERT_LEAD_SQL, batch)
+    app.bump_data_version(conn)
+    conn.commit()
+    conn.execute('ANALYZE')
+    conn.close()
+    return path
+
+def copy_database(size, seed=DEFAULT_SEED):
+    """Copy the generated database for a size and seed to a scratch file and return its path.
+    
+    The create, update and delete scenarios change the data, so each run
+    works on a fresh copy and starts from the same rows.
+    """
+    source = sqlite3.connect(generate_database(size, seed))
+    path = os.path.join(DATA_DIR, f'run_{size}_{seed}.db')
+    remove_database(path)
+    target = sqlite3.connect(path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate seeded synthetic lead databases')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--force', action='store_true', help='Regenerate existing databases')
+    args = parser.parse_args(argv)
+    
+    for size in args.sizes:
+        path = generate_database(size, args.seed, args.force)
+        print(f'{size} leads -> {path}', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
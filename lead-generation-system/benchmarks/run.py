@@ -0,0 +1,267 @@
+"""
+Scenario benchmarks for the lead API.
+
+Each scenario is run against a fresh copy of a generated database through
+Flask's test client and through a real threaded WSGI server on localhost.
+The report is JSON with p50/p95/p99 latency, requests/sec and peak traced
+heap per scenario, so two runs can be compared with benchmarks.compare.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+import app
+from benchmarks.generate import DEFAULT_SEED, copy_database, generate_lead
+
+DEFAULT_REQUESTS = 500
+EXPORT_REQUESTS = 3
+MEMORY_REQUESTS = 20
+SERVER_HOST = '127.0.0.1'
+
+# ===== Scenarios =====
+# Each scenario maps a random generator and a state dict to the
+# (method, path, JSON body) of the next request to send.
+
+def list_first_page(rng, state):
+    return 'GET', '/api/leads?limit=100', None
+
+def list_filtered(rng, state):
+    status = rng.choice(['New', 'Contacted', 'Qualified', 'Converted', 'Lost'])
+    return 'GET', f'/api/leads?limit=100&status={status}&fields=id,first_name,email,status', None
+
+def list_deep_page(rng, state):
+    cursor = state.get('deep_cursor')
+    return 'GET', f'/api/leads?limit=100&cursor={cursor}' if cursor else '/api/leads?limit=100', None
+
+def get_lead(rng, state):
+    return 'GET', f'/api/leads/{rng.randint(1, state["size"])}', None
+
+def create_lead(rng, state):
+    lead, _ = generate_lead(rng, state['size'] + rng.randrange(10 ** 9), datetime(2024, 1, 1), 1)
+    return 'POST', '/api/leads', lead
+
+def update_lead(rng, state):
+    lead_id = rng.randint(1, state['size'])
+    return 'PUT', f'/api/leads/{lead_id}', {'status': rng.choice(['Contacted', 'Qualified'])}
+
+def delete_lead(rng, state):
+    # Delete leads created by the create scenario so the data set stays the same size
+    lead_id = state['created'].pop() if state['created'] else 0
+    return 'DELETE', f'/api/leads/{lead_id}', None
+
+def export_leads(rng, state):
+    return 'GET', '/api/leads/export', None
+
+SCENARIOS = {
+    'list': (list_first_page, DEFAULT_REQUESTS),
+    'list_filtered': (list_filtered, DEFAULT_REQUESTS),
+    'list_deep_page': (list_deep_page, DEFAULT_REQUESTS),
+    'get': (get_lead, DEFAULT_REQUESTS),
+    'create': (create_lead, DEFAULT_REQUESTS),
+    'update': (update_lead, DEFAULT_REQUESTS),
+    'delete': (delete_lead, DEFAULT_REQUESTS),
+    'export': (export_leads, EXPORT_REQUESTS),
+}
+
+# ===== Transports =====
+class TestClientTransport:
+    """Send requests in-process through Flask's test client"""
+    
+    name = 'test_client'
+    traces_heap = True
+    
+    def __init__(self):
+        self.client = app.app.test_client()
+    
+    def request(self, method, path, body):
+        response = self.client.open(path, method=method, json=body)
+        data = response.get_data()
+        return response.status_code, data, response.headers
+    
+    def close(self):
+        pass
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Request handler that skips per-request access logging"""
+    
+    def log_request(self, *args, **kwargs):
+        pass
+
+class ServerTransport:
+    """Send requests over HTTP to a threaded WSGI server on localhost"""
+    
+    name = 'wsgi_server'
+    # The development server drains every closed connection through a 10 MB
+    # read buffer, which would swamp the traced peak of any request
+    traces_heap = False
+    
+    def __init__(self):
+        self.server = make_server(
+            SERVER_HOST, 0, app.app, threaded=True, request_handler=QuietRequestHandler
+        )
+        self.base_url = f'http://{SERVER_HOST}:{self.server.server_port}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+    
+    def request(self, method, path, body):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        if data is not None:
+            req.add_header('Content-Type', 'application/json')
+        try:
+            with urllib.request.urlopen(req) as response:
+                return response.status, response.read(), response.headers
+        except urllib.error.HTTPError as e:
+            return e.code, e.read(), e.headers
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+TRANSPORTS = {'test_client': TestClientTransport, 'wsgi_server': ServerTransport}
+
+# ===== Measurement =====
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def send_requests(transport, scenario, requests, rng, state):
+    """Send requests of one scenario and return their latencies and status counts"""
+    make_request, _ = SCENARIOS[scenario]
+    latencies = []
+    statuses = {}
+    for _ in range(requests):
+        method, path, body = make_request(rng, state)
+        t0 = time.perf_counter()
+        status, data, headers = transport.request(method, path, body)
+        latencies.append(time.perf_counter() - t0)
+        statuses[status] = statuses.get(status, 0) + 1
+        
+        if scenario == 'create' and status == 201:
+            state['created'].append(json.loads(data)['id'])
+        if scenario == 'list_deep_page':
+            state['deep_cursor'] = headers.get('X-Next-Cursor')
+    return latencies, statuses
+
+def peak_heap_bytes(transport, scenario, requests, rng, state):
+    """Peak traced Python heap while serving requests of one scenario.
+    
+    Tracing slows every allocation down, so this runs as a separate pass
+    after the timed one rather than inflating its latencies.
+    """
+    tracemalloc.start()
+    try:
+        send_requests(transport, scenario, requests, rng, state)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_scenario(transport, scenario, requests, state, seed, measure_memory):
+    """Run one scenario and return its latency, throughput and memory summary"""
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    latencies, statuses = send_requests(transport, scenario, requests, rng, state)
+    elapsed = time.perf_counter() - started
+    peak_heap = None
+    if measure_memory and transport.traces_heap:
+        peak_heap = peak_heap_bytes(transport, scenario, min(requests, MEMORY_REQUESTS), rng, state)
+    
+    latencies.sort()
+    ms = lambda seconds: round(seconds * 1000, 3) if seconds is not None else None
+    return {
+        'requests': requests,
+        'statuses': {str(k): v for k, v in sorted(statuses.items())},
+        'p50_ms': ms(percentile(latencies, 0.50)),
+        'p95_ms': ms(percentile(latencies, 0.95)),
+        'p99_ms': ms(percentile(latencies, 0.99)),
+        'max_ms': ms(latencies[-1] if latencies else None),
+        'requests_per_sec': round(requests / elapsed, 2) if elapsed else None,
+        'peak_heap_bytes': peak_heap
+    }
+
+def git_commit():
+    """Current git commit of the working tree, if available"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(sizes, scenarios, transports, requests=None, seed=DEFAULT_SEED,
+        measure_memory=True, use_cache=True):
+    """Run every scenario for every size and transport and return the report dict"""
+    if not use_cache:
+        app.response_cache.max_bytes = 0
+    
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'seed': seed,
+        'response_cache': use_cache,
+        'results': []
+    }
+    
+    for size in sizes:
+        for transport_name in transports:
+            app.DATABASE = copy_database(size, seed)
+            app.db_pool = app.ConnectionPool(app.DB_POOL_SIZE, app.DB_POOL_TIMEOUT)
+            transport = TRANSPORTS[transport_name]()
+            state = {'size': size, 'created': []}
+            try:
+                for scenario in scenarios:
+                    count = requests or SCENARIOS[scenario][1]
+                    if scenario == 'export':
+                        count = min(count, EXPORT_REQUESTS)
+                    print(f'{size} leads / {transport_name} / {scenario} x{count}', file=sys.stderr)
+                    result = run_scenario(transport, scenario, count, state, seed, measure_memory)
+                    result.update({'size': size, 'transport': transport_name, 'scenario': scenario})
+                    report['results'].append(result)
+            finally:
+                transport.close()
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the lead API')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000])
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--transports', nargs='+', choices=list(TRANSPORTS), default=list(TRANSPORTS))
+    parser.add_argument('--requests', type=int, help='Requests per scenario (export is capped)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the traced pass that measures peak Python heap per scenario')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the response cache')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+    
+    report = run(args.sizes, args.scenarios, args.transports, args.requests, args.seed,
+                 not args.no_memory, not args.no_cache)
+    
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
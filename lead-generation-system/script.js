@@ -8,6 +8,10 @@ const closeLeadsBtn = document.getElementById('closeLeadsBtn');
 const exportBtn = document.getElementById('exportBtn');
 const leadsSection = document.getElementById('leadsSection');
 const leadsTableBody = document.getElementById('leadsTableBody');
+const loadMoreBtn = document.getElementById('loadMoreBtn');
+
+// Cursor for the next page of leads, from the X-Next-Cursor response header
+let nextCursor = null;
 
 // ===== Form Submission =====
 leadForm.addEventListener('submit', async (e) => {
@@ -70,22 +74,57 @@ closeLeadsBtn.addEventListener('click', () => {
     leadsSection.style.display = 'none';
 });
 
+loadMoreBtn.addEventListener('click', loadMoreLeads);
+
 // ===== Load Leads =====
 async function loadLeads() {
     try {
-        const response = await fetch(`${API_BASE_URL}/leads`);
-        const leads = await response.json();
+        const [leadsResponse, statsResponse] = await Promise.all([
+            fetch(`${API_BASE_URL}/leads`),
+            fetch(`${API_BASE_URL}/leads/stats?group_by=status`)
+        ]);
+        const leads = await leadsResponse.json();
+        const stats = await statsResponse.json();
         
+        setNextCursor(leadsResponse);
         displayLeads(leads);
-        updateStats(leads);
+        updateStats(stats);
+    } catch (error) {
+        console.error('Error loading leads:', error);
+        showToast('Failed to load leads', 'error');
+    }
+}
+
+async function loadMoreLeads() {
+    if (!nextCursor) return;
+    
+    try {
+        loadMoreBtn.disabled = true;
+        const response = await fetch(`${API_BASE_URL}/leads?cursor=${encodeURIComponent(nextCursor)}`);
+        const leads = await response.json();
+        
+        setNextCursor(response);
+        displayLeads(leads, true);
     } catch (error) {
         console.error('Error loading leads:', error);
         showToast('Failed to load leads', 'error');
+    } finally {
+        loadMoreBtn.disabled = false;
     }
 }
 
+function setNextCursor(response) {
+    nextCursor = response.headers.get('X-Next-Cursor');
+    loadMoreBtn.style.display = nextCursor ? 'inline-flex' : 'none';
+}
+
 // ===== Display Leads =====
-function displayLeads(leads) {
+function displayLeads(leads, append = false) {
+    if (append) {
+        leadsTableBody.insertAdjacentHTML('beforeend', leads.map(leadRow).join(''));
+        return;
+    }
+    
     if (leads.length === 0) {
         leadsTableBody.innerHTML = `
             <tr>
@@ -98,7 +137,11 @@ function displayLeads(leads) {
         return;
     }
     
-    leadsTableBody.innerHTML = leads.map(lead => `
+    leadsTableBody.innerHTML = leads.map(leadRow).join('');
+}
+
+function leadRow(lead) {
+    return `
         <tr>
             <td>${lead.id}</td>
             <td>${lead.first_name} ${lead.last_name}</td>
@@ -116,15 +159,18 @@ function displayLeads(leads) {
                 </div>
             </td>
         </tr>
-    `).join('');
+    `;
 }
 
 // ===== Update Statistics =====
-function updateStats(leads) {
-    document.getElementById('totalLeads').textContent = leads.length;
-    document.getElementById('newLeads').textContent = leads.filter(l => l.status === 'New').length;
-    document.getElementById('qualifiedLeads').textContent = leads.filter(l => l.status === 'Qualified').length;
-    document.getElementById('convertedLeads').textContent = leads.filter(l => l.status === 'Converted').length;
+function updateStats(stats) {
+    const counts = Object.fromEntries(stats.map(s => [s.status, s.count]));
+    const total = stats.reduce((sum, s) => sum + s.count, 0);
+    
+    document.getElementById('totalLeads').textContent = total;
+    document.getElementById('newLeads').textContent = counts['New'] || 0;
+    document.getElementById('qualifiedLeads').textContent = counts['Qualified'] || 0;
+    document.getElementById('convertedLeads').textContent = counts['Converted'] || 0;
 }
 
 // ===== Edit Lead =====